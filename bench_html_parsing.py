@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from src.services.cake_service import JobDescriptionCake, ProfileCake, parse_job_listing
+from src.services.html_backend import BACKENDS
+
+# Saved Cake pages; drop more *.html pages into the folder to benchmark on real crawls
+fixture_folder = Path(sys.argv[1] if len(sys.argv) > 1 else "examples/html")
+repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+
+def extract(html: str, backend: str, kind: str):
+    if kind == "job_listing":
+        return parse_job_listing(html, backend)
+    if kind == "job":
+        return JobDescriptionCake("https://www.cake.me/jobs/fixture", "fixture", None).parse_job(html, backend)
+    return ProfileCake("https://www.cake.me/me/fixture", None).parse_profile(html, backend)
+
+
+def page_kind(path: Path) -> str:
+    for kind in ("job_listing", "job"):
+        if path.stem.startswith(kind):
+            return kind
+    return "profile"
+
+
+pages = [(path.name, page_kind(path), path.read_text(encoding="utf-8")) for path in sorted(fixture_folder.glob("*.html"))]
+print(f"{len(pages)} pages from {fixture_folder}, {repeat} runs each, backends: {sorted(BACKENDS)}")
+
+start = time.perf_counter()
+for _ in range(repeat):
+    for _, _, html in pages:
+        BeautifulSoup(html, "html.parser")
+baseline = (time.perf_counter() - start) / repeat / len(pages) * 1000
+print(f"{'bs4 html.parser, parse only':<32}{baseline:8.3f} ms/page")
+
+results = {}
+for backend in BACKENDS:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, kind, html in pages:
+            extract(html, backend, kind)
+    elapsed = (time.perf_counter() - start) / repeat / len(pages) * 1000
+    print(f"{backend + ', parse + extract':<32}{elapsed:8.3f} ms/page")
+    results[backend] = [extract(html, backend, kind) for _, kind, html in pages]
+
+reference = json.dumps(results["bs4"], sort_keys=True)
+for backend, extracted in results.items():
+    same = json.dumps(extracted, sort_keys=True) == reference
+    print(f"{backend}: {'same output as bs4' if same else 'OUTPUT DIFFERS from bs4'}")
@@ -1,12 +1,17 @@
 import os
+import json
+import time
+import hashlib
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
 from src.services.jd_service import jd_generate
 from src.services.resume_scoring import ResumeScorer
 from src.services.pdf_parser import PdfParser
+from src.services.score_cache import TTLCache, ranking_key
+from src.utils.file_utils import dir_version
 from src.routes.cake import scrape_persons_cake_endpoint
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -16,9 +21,103 @@ load_dotenv()
 SERVER_NAME = "CakeScraperServer"
 SERVER_HOST = os.environ.get("SERVER_HOST", "0.0.0.0")
 SERVER_PORT = int(os.environ.get("SERVER_PORT", 1102))
+INDEX_DIR = os.environ.get("INDEX_DIR", "data/index")
+LSA_LISTS = int(os.environ.get("LSA_LISTS", 0))
+LSA_NPROBE = int(os.environ.get("LSA_NPROBE", 0))
+FIELD_WEIGHTS = json.loads(os.environ.get("FIELD_WEIGHTS", "{}"))
+NORMALIZE_SCORES = os.environ.get("NORMALIZE_SCORES", "false").lower() == "true"
+SYNONYMS_FILE = os.environ.get("SYNONYMS_FILE", "data/synonyms.json")
+ENGINES = ("tfidf", "lsa", "keyword", "incremental")
+RANKING_CACHE_SIZE = int(os.environ.get("RANKING_CACHE_SIZE", 128))
+RANKING_CACHE_TTL = float(os.environ.get("RANKING_CACHE_TTL", 600))
 
 mcp = FastMCP(name=SERVER_NAME, host=SERVER_HOST, port=SERVER_PORT)
 pdf_parser = PdfParser("Element/ner_700i_500e_4_512.onnx", "Element/lilt-tokenizer", "Element/classes.yaml")
+scorers: Dict[str, ResumeScorer] = {}
+saved_versions: Dict[str, int] = {}
+synonyms: Dict[str, List[str]] = {}
+if os.path.exists(SYNONYMS_FILE):
+    with open(SYNONYMS_FILE, encoding="utf-8") as f:
+        synonyms = json.load(f)
+ranking_cache = TTLCache(max_entries=RANKING_CACHE_SIZE, ttl=RANKING_CACHE_TTL)
+continuations = TTLCache(max_entries=RANKING_CACHE_SIZE, ttl=RANKING_CACHE_TTL)
+
+def get_index_path(resume_dir: str) -> str:
+    return os.path.join(INDEX_DIR, hashlib.sha1(os.path.abspath(resume_dir).encode()).hexdigest()[:16])
+
+def get_scorer(resume_dir: str, deadline: Optional[float] = None) -> ResumeScorer:
+    """Return a scorer whose corpus index is warm and in sync with resume_dir (as far as deadline allows)."""
+    index_path = get_index_path(resume_dir)
+    scorer = scorers.get(resume_dir)
+    if scorer is None:
+        scorer = ResumeScorer(pdf_parser, max_length=512, field_weights=FIELD_WEIGHTS, normalize=NORMALIZE_SCORES)
+        scorer.load_index(index_path)
+        scorers[resume_dir] = scorer
+        saved_versions[resume_dir] = scorer.index.version
+    scorer.sync_dir(resume_dir, deadline=deadline)
+    # Saving rewrites the whole index, so a deadline-bounded sync leaves it in
+    # memory until a later call has brought the directory fully up to date
+    if scorer.index.version != saved_versions[resume_dir] and (
+        deadline is None or scorer.coverage(resume_dir)["complete"]
+    ):
+        scorer.save_index(index_path)
+        saved_versions[resume_dir] = scorer.index.version
+    return scorer
+
+def score_to_dict(s) -> Dict[str, Any]:
+    return {
+        "id": s.id,
+        "name": s.name,
+        "email": s.email,
+        "phone": s.phone,
+        "location": s.location,
+        "total_score": s.total,
+        "hardskill": s.hardskill,
+        "softskill": s.softskill,
+        "education": s.education,
+        "experience": s.experience,
+        "project": s.project,
+        "language": s.language,
+    }
+
+def rank_resumes(
+    job_name: str,
+    extra_information: Optional[str],
+    resume_dir: str,
+    shortlist: Optional[int],
+    top_k: Optional[int],
+    engine: str,
+    explain: bool,
+    field_weights: Optional[Dict[str, float]] = None,
+    deadline: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    from src.models.resume_entity import ScoreFactor
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}; valid engines: {', '.join(ENGINES)}")
+    jd = jd_generate(job_name, extra_information or "")
+    jd_dict = jd.model_dump()
+    scorer = get_scorer(resume_dir, deadline=deadline)
+    scorer.field_weights = field_weights or FIELD_WEIGHTS
+    if engine == "lsa":
+        scorer.sync_dense(get_index_path(resume_dir) + "_lsa", n_lists=LSA_LISTS)
+        score_list, _, explanations = scorer.score_dense(ScoreFactor(**jd_dict), nprobe=LSA_NPROBE or None, top_k=top_k)
+    elif engine == "keyword":
+        return [
+            keyword_score.model_dump()
+            for keyword_score in scorer.keyword_rank(ScoreFactor(**jd_dict), synonyms=synonyms, top_k=top_k)
+        ]
+    elif engine == "incremental":
+        score_list, _, explanations = scorer.rescore(ScoreFactor(**jd_dict), top_k=top_k)
+    else:  # tfidf
+        score_list, _, explanations = scorer.score_index(
+            ScoreFactor(**jd_dict), shortlist=shortlist, top_k=top_k, explain=explain
+        )
+    explanations = {explanation.id: explanation.model_dump()["fields"] for explanation in explanations}
+    result = [score_to_dict(s) for s in score_list]
+    if explanations:
+        for item in result:
+            item["explanation"] = explanations.get(item["id"], {})
+    return result
 
 # Dummy implementations replacing Supabase
 async def workflow_update_step(user_id: str, workflow_id: str, step: str, status: str, detail: Optional[str] = None):
@@ -47,17 +146,27 @@ async def collect_cvs(
     job_name: str,
     location: str,
     amount_people: int = 3,
+    concurrency: Optional[int] = None,
+    rate_per_host: Optional[float] = None,
+    render_pdf: Optional[bool] = None,
     user_id: Optional[str] = None,
     workflow_id: Optional[str] = None,
 ) -> Dict[str, Any]:
+    """Crawl Cake profiles for a job; concurrency and rate_per_host (requests/s) default to the CRAWL_* settings.
+
+    Profiles are stored as structured JSON that rank_cvs scores without PDF
+    parsing; render_pdf (default RENDER_PROFILE_PDF) also renders each one to PDF.
+    """
     step_name = "collect_cvs"
     if user_id and workflow_id:
         await workflow_update_step(user_id, workflow_id, step_name, "pending")
     try:
+        crawl_options = {"worker": concurrency, "rate_per_host": rate_per_host, "render_pdf": render_pdf}
         pcv = await scrape_persons_cake_endpoint(
             keyword=job_name,
             location=location,
-            max_links_person=amount_people
+            max_links_person=amount_people,
+            **{key: value for key, value in crawl_options.items() if value is not None},
         )
         if user_id and workflow_id:
             await workflow_update_step(user_id, workflow_id, step_name, "finished")
@@ -83,43 +192,104 @@ async def rank_cvs(
     job_name: str,
     extra_information: Optional[str] = None,
     resume_dir: str = "data/CV_cake",
+    shortlist: Optional[int] = None,
+    top_k: Optional[int] = None,
+    engine: str = "tfidf",
+    explain: bool = False,
+    field_weights: Optional[Dict[str, float]] = None,
+    deadline_ms: Optional[int] = None,
+    continuation: Optional[str] = None,
     user_id: Optional[str] = None,
     workflow_id: Optional[str] = None,
 ) -> Dict[str, Any]:
-    from src.models.resume_entity import ScoreFactor
+    """Rank the CVs in resume_dir for a job.
+
+    With deadline_ms, parsing stops when the budget runs out and the ranking
+    covers the CVs indexed so far; the response then carries coverage stats
+    and a continuation handle. Passing that handle back (with only a new
+    deadline_ms) resumes parsing where it stopped. field_weights scales each
+    field score in the total (defaults to the FIELD_WEIGHTS setting).
+    """
+    start = time.monotonic()
     step_name = "rank_cvs"
     if user_id and workflow_id:
         await workflow_update_step(user_id, workflow_id, step_name, "pending")
     try:
-        jd = jd_generate(job_name, extra_information or "")
-        jd_dict = jd.model_dump()
-        scorer = ResumeScorer(pdf_parser, max_length=512)
-        score_list, _, _ = scorer.score_from_dir(resume_dir, ScoreFactor(**jd_dict))
-        ranked = sorted(score_list, key=lambda x: x.total, reverse=True)
+        if continuation:
+            request = continuations.get(continuation)
+            if request is None:
+                raise ValueError(f"Unknown or expired continuation: {continuation}")
+            job_name, extra_information, resume_dir, shortlist, top_k, engine, explain, field_weights = request
+        request = (job_name, extra_information, resume_dir, shortlist, top_k, engine, explain, field_weights)
+        cache_key = (
+            ranking_key(
+                job_name, extra_information or "", shortlist, top_k, engine, explain,
+                json.dumps(field_weights or FIELD_WEIGHTS, sort_keys=True),
+            ),
+            os.path.abspath(resume_dir),
+            dir_version(resume_dir),
+        )
+        result = ranking_cache.get(cache_key)
+        coverage = None
+        if result is None:
+            deadline = start + deadline_ms / 1000 if deadline_ms is not None else None
+            result = rank_resumes(*request, deadline=deadline)
+            coverage = scorers[resume_dir].coverage(resume_dir)
+            if coverage["complete"]:
+                ranking_cache.put(cache_key, result)
+        else:
+            logger.info(f"Ranking cache hit for {job_name} in {resume_dir}")
+        summary = f"Ranked {len(result)} CVs for {job_name}."
+        response = {"status": "success", "summary": summary, "ranked_cvs": result}
+        if coverage is not None and not coverage["complete"]:
+            handle = cache_key[0] + ":" + hashlib.sha1(os.path.abspath(resume_dir).encode()).hexdigest()[:16]
+            continuations.put(handle, request)
+            summary += f" Deadline reached with {coverage['pending']} of {coverage['files']} files still pending."
+            response.update(summary=summary, status="partial", coverage=coverage, continuation=handle)
+        if user_id and workflow_id:
+            await workflow_update_step(user_id, workflow_id, step_name, "finished")
+            await workflow_append_chat(user_id, workflow_id, summary, sender="system")
+        return response
+    except Exception as e:
+        logger.error(f"Error ranking CVs: {e}", exc_info=True)
+        if user_id and workflow_id:
+            await workflow_update_step(user_id, workflow_id, step_name, "error", detail=str(e))
+            await workflow_append_chat(user_id, workflow_id, f"Error ranking CVs: {str(e)}", sender="system")
+        return {
+            "status": "error",
+            "summary": f"Error ranking CVs: {str(e)}",
+            "ranked_cvs": []
+        }
+
+@mcp.tool()
+async def rank_cvs_many(
+    job_descriptions: List[Dict[str, Any]],
+    resume_dir: str = "data/CV_cake",
+    top_k: Optional[int] = None,
+    user_id: Optional[str] = None,
+    workflow_id: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Rank one CV pool against several JDs, each a ScoreFactor dict (job_title labels the ranking)."""
+    from src.models.resume_entity import ScoreFactor
+    step_name = "rank_cvs_many"
+    if user_id and workflow_id:
+        await workflow_update_step(user_id, workflow_id, step_name, "pending")
+    try:
+        jds = [ScoreFactor(**jd_dict) for jd_dict in job_descriptions]
+        scorer = get_scorer(resume_dir)
+        scorer.field_weights = FIELD_WEIGHTS
+        rankings = scorer.score_many(jds, top_k=top_k)
         result = [
-            {
-                "id": s.id,
-                "name": s.name,
-                "email": s.email,
-                "phone": s.phone,
-                "location": s.location,
-                "total_score": s.total,
-                "hardskill": s.hardskill,
-                "softskill": s.softskill,
-                "education": s.education,
-                "experience": s.experience,
-                "project": s.project,
-                "language": s.language,
-            }
-            for s in ranked
+            {"job_title": jd.job_title, "ranked_cvs": [score_to_dict(s) for s in ranking]}
+            for jd, ranking in zip(jds, rankings)
         ]
         if user_id and workflow_id:
             await workflow_update_step(user_id, workflow_id, step_name, "finished")
-            await workflow_append_chat(user_id, workflow_id, f"Ranked {len(result)} CVs for {job_name}.", sender="system")
+            await workflow_append_chat(user_id, workflow_id, f"Ranked CVs for {len(jds)} job descriptions.", sender="system")
         return {
             "status": "success",
-            "summary": f"Ranked {len(result)} CVs for {job_name}.",
-            "ranked_cvs": result,
+            "summary": f"Ranked CVs for {len(jds)} job descriptions.",
+            "rankings": result,
         }
     except Exception as e:
         logger.error(f"Error ranking CVs: {e}", exc_info=True)
@@ -129,7 +299,7 @@ async def rank_cvs(
         return {
             "status": "error",
             "summary": f"Error ranking CVs: {str(e)}",
-            "ranked_cvs": []
+            "rankings": []
         }
 
 if __name__ == "__main__":
@@ -45,4 +45,22 @@ class Score(BaseModel):
     total: float = 0.0
     # honor: float = 0.0
     # certificate: float = 0.0
-    # publication: float = 0.0
\ No newline at end of file
+    # publication: float = 0.0
+
+class SentenceMatch(BaseModel):
+    sentence: str
+    score: float = 0.0
+    jd_index: int = -1  # best matching JD sentence of the same field, -1 if nothing matched
+
+
+class Explanation(BaseModel):
+    id: str = ""
+    fields: dict[str, list[SentenceMatch]] = {}
+
+
+class KeywordScore(BaseModel):
+    id: str = ""
+    name: str = ""
+    matches: dict[str, dict[str, int]] = {}  # field -> JD phrase -> occurrences
+    coverage: dict[str, float] = {}  # field -> share of the field's JD phrases found
+    total: float = 0.0
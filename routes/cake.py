@@ -8,7 +8,9 @@ import sys
 import os
 from src.utils.file_utils import sanitize_filename, save_dict_data_to_txt, log_error
 # from src.utils.save_to_db import es_client
-from src.services.cake_service import crawl_links_person_cake_google, ProfileCake, html_to_pdf, crawl_job_listings, \
+from src.services.crawl_scheduler import CrawlScheduler
+from src.services.profile_sections import save_profile
+from src.services.cake_service import crawl_links_person_cake_google, ProfileCake, html_to_pdf, aiter_job_listings, \
     JobDescriptionCake
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
@@ -18,28 +20,37 @@ PROFILE_PERSONS_FILE = os.getenv("PROFILE_PERSONS_FILE", "data/profile_persons.t
 INDEX_FOR_JOB_CAKE = os.getenv("INDEX_FOR_JOB_CAKE")
 INDEX_FOR_PROFILE_CAKE = os.getenv("INDEX_FOR_PROFILE_CAKE")
 PREFIX_FOR_FILE_PDF_PROFILE_CAKE = os.getenv("PREFIX_FOR_FILE_PDF_PROFILE_CAKE")
+CRAWL_WORKERS = int(os.getenv("CRAWL_WORKERS", 3))
+CRAWL_RATE_PER_HOST = float(os.getenv("CRAWL_RATE_PER_HOST", 2.0))
+RENDER_PROFILE_PDF = os.getenv("RENDER_PROFILE_PDF", "false").lower() == "true"
 
 
 async def scrape_jobs_cake_endpoint(
         keyword: str,
         location: str = "Vietnam",
         max_pages: int = 100,
-        max_jobs: int = 25
+        max_jobs: int = 25,
+        worker: int = CRAWL_WORKERS,
+        rate_per_host: float = CRAWL_RATE_PER_HOST
 ):
     list_of_jobs = []
     try:
         start_time = time.time()
-        links_job = crawl_job_listings(keyword, location, max_pages, max_jobs, None)
-        if len(links_job) > 0:
-            for link in links_job:
-                job_data = JobDescriptionCake(link, keyword, None).crawl_job()
-                # es_client.save_job_description(job_data, index_name=INDEX_FOR_JOB_CAKE)
-                list_of_jobs.append(job_data)
+        async with CrawlScheduler(worker, rate_per_host) as scheduler:
+            # Job pages start downloading while later listing pages are still in flight
+            futures = []
+            async for link in aiter_job_listings(keyword, location, max_pages, max_jobs, None, scheduler=scheduler):
+                futures.append(scheduler.submit(link, JobDescriptionCake(link, keyword, None).acrawl_job, priority=len(futures)))
+            results = await asyncio.gather(*futures, return_exceptions=True)
+            crawl_stats = scheduler.stats()
+        list_of_jobs = [job_data for job_data in results if isinstance(job_data, dict)]
+        # es_client.save_job_description(job_data, index_name=INDEX_FOR_JOB_CAKE)
 
         end_time = time.time() - start_time
         return {
             "message": f"{len(list_of_jobs)} Job: {keyword} scraping finished successfully with {end_time} seconds.",
-            "total_jobs": list_of_jobs}
+            "total_jobs": list_of_jobs,
+            "crawl_stats": crawl_stats}
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
@@ -50,8 +61,17 @@ async def scrape_persons_cake_endpoint(
         location: str = "Malaysia",
         max_links_person: int = 3,
         cv_pdf_folder: str = "data",
-        worker: int = 3
+        worker: int = CRAWL_WORKERS,
+        rate_per_host: float = CRAWL_RATE_PER_HOST,
+        render_pdf: bool = RENDER_PROFILE_PDF
 ):
+    """
+    Crawl up to max_links_person profiles with `worker` concurrent tasks,
+    at most `rate_per_host` requests per second to each host.
+
+    Each profile is saved as structured JSON in the CV folder, where rank_cvs
+    scores it directly; the Browserless PDF is only rendered with `render_pdf`.
+    """
     cv_pdf_folder_new = os.path.join(cv_pdf_folder, "CV_cake")
     if not os.path.exists(cv_pdf_folder_new):
         os.makedirs(cv_pdf_folder_new)
@@ -66,20 +86,25 @@ async def scrape_persons_cake_endpoint(
             """
             Process a single link to scrape person data and convert it to PDF.
             """
-            async with asyncio.Semaphore(worker):
-                person_dict, link_resume = ProfileCake(link, None).crawl_profile()
-                persons_dict.append(person_dict)
-                # save_dict_data_to_txt(person_dict, PROFILE_PERSONS_FILE)
-                # es_client.save_profile(person_dict, index_name=INDEX_FOR_PROFILE_CAKE)
+            person_dict, link_resume = await ProfileCake(link, None).acrawl_profile()
+            persons_dict.append(person_dict)
+            # save_dict_data_to_txt(person_dict, PROFILE_PERSONS_FILE)
+            # es_client.save_profile(person_dict, index_name=INDEX_FOR_PROFILE_CAKE)
+            save_profile(person_dict, cv_pdf_folder_new, link)
+            if render_pdf:
                 await html_to_pdf(link, link_resume, cv_pdf_folder_new)
 
-        # Run multiple workers concurrently
-        await asyncio.gather(*(process_link(link) for link in links))
+        # One shared worker pool, rate limited per host; earlier search results first
+        async with CrawlScheduler(worker, rate_per_host) as scheduler:
+            futures = [scheduler.submit(link, process_link, link, priority=rank) for rank, link in enumerate(links)]
+            await asyncio.gather(*futures, return_exceptions=True)
+            crawl_stats = scheduler.stats()
 
         end_time = time.time() - start_time
         return {
             "message": f"Persons scraping finished successfully => {len(persons_dict)} persons with {end_time:.2f} seconds.",
-            "persons_dict": persons_dict}
+            "persons_dict": persons_dict,
+            "crawl_stats": crawl_stats}
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
@@ -102,7 +127,7 @@ async def scrape_one_person_cake_endpoint(
         async def process_link(profile_url):
             async with semaphore:
                 try:
-                    person_dict, link_resume = ProfileCake(profile_url, None).crawl_profile()
+                    person_dict, link_resume = await ProfileCake(profile_url, None).acrawl_profile()
                     result.append(person_dict)
                     save_dict_data_to_txt(person_dict, PROFILE_PERSONS_FILE)
                     await html_to_pdf(profile_url, link_resume, cv_pdf_folder)
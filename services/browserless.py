@@ -1,5 +1,10 @@
+import asyncio
+import io
+import logging
 import os
-import requests
+import random
+
+import httpx
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -7,29 +12,157 @@ load_dotenv()
 
 BROWSERLESS_URL = os.environ.get("BROWSERLESS_URL")
 BROWSERLESS_TOKEN = os.environ.get("BROWSERLESS_TOKEN")
+# Renders allowed in flight at once; each one holds a headless Chrome tab on the Browserless instance
+BROWSERLESS_CONCURRENCY = int(os.environ.get("BROWSERLESS_CONCURRENCY", 2))
+BROWSERLESS_TIMEOUT = float(os.environ.get("BROWSERLESS_TIMEOUT", 120))
+BROWSERLESS_RETRIES = int(os.environ.get("BROWSERLESS_RETRIES", 2))
+
+PDF_OPTIONS = {
+    "printBackground": True,
+    "format": "A4",
+    "margin": {
+        "top": "10mm",
+        "right": "10mm",
+        "bottom": "10mm",
+        "left": "10mm"
+    }
+}
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+CHUNK_SIZE = 64 * 1024
 
-def browserless_pdf(url, output_path, file_name="output.pdf"):
+
+class BrowserlessRenderer:
     """
-    Save a PDF of the given URL using Browserless service.
+    Async client for the Browserless /pdf endpoint.
+
+    Requests share one pooled connection set, at most `max_renders` renders
+    are in flight at once (further calls wait for a slot), and the PDF is
+    streamed to its destination in chunks instead of being held in memory.
+    Transport errors and 408/429/5xx responses are retried `retries` times
+    with jittered exponential backoff; a failed attempt's partial output is
+    discarded. `base_url` can point at a local stub server in tests, or
+    `transport` can replace the network altogether (e.g. httpx.MockTransport).
     """
-    endpoint = f"{BROWSERLESS_URL}/pdf?token={BROWSERLESS_TOKEN}"
-    payload = {
-        "url": url,
-        "options": {
-            "printBackground": True,
-            "format": "A4",
-            "margin": {
-                "top": "10mm",
-                "right": "10mm",
-                "bottom": "10mm",
-                "left": "10mm"
-            }
-        }
-    }
-    response = requests.post(endpoint, json=payload, timeout=120)
-    response.raise_for_status()
-    os.makedirs(output_path, exist_ok=True)  # <-- create folder if not exist
-    pdf_output_path = os.path.join(output_path, file_name)
-    with open(pdf_output_path, "wb") as f:
-        f.write(response.content)
-    return pdf_output_path
\ No newline at end of file
+
+    def __init__(
+        self,
+        base_url: str = BROWSERLESS_URL,
+        token: str = BROWSERLESS_TOKEN,
+        max_renders: int = BROWSERLESS_CONCURRENCY,
+        timeout: float = BROWSERLESS_TIMEOUT,
+        retries: int = BROWSERLESS_RETRIES,
+        backoff: float = 1.0,
+        transport: httpx.AsyncBaseTransport = None,
+    ):
+        self.endpoint = f"{base_url}/pdf"
+        self.params = {"token": token} if token else {}
+        self.max_renders = max(max_renders, 1)
+        self.retries = retries
+        self.backoff = backoff
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=10.0),
+            limits=httpx.Limits(max_connections=self.max_renders, max_keepalive_connections=self.max_renders),
+            transport=transport,
+        )
+        self._slots = None
+        self.in_flight = 0
+        self.rendered = 0
+        self.failed = 0
+
+    def _slot(self) -> asyncio.Semaphore:
+        # Created on first use so it binds to the running event loop
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_renders)
+        return self._slots
+
+    def _delay(self, attempt: int, response: httpx.Response = None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * 2 ** attempt * (1 + random.random())
+
+    async def render(self, url: str, sink, options: dict = None) -> int:
+        """
+        Render `url` to PDF, writing the bytes to `sink` as they arrive.
+
+        Args:
+            url (str): The page to render.
+            sink: A seekable binary file object; rewound and truncated before each retry.
+            options (dict): Browserless PDF options, PDF_OPTIONS by default.
+
+        Returns:
+            int: The size of the PDF in bytes.
+        """
+        payload = {"url": url, "options": options or PDF_OPTIONS}
+        async with self._slot():
+            self.in_flight += 1
+            try:
+                for attempt in range(self.retries + 1):
+                    sink.seek(0)
+                    sink.truncate()
+                    response = None
+                    try:
+                        async with self.client.stream("POST", self.endpoint, params=self.params, json=payload) as response:
+                            if response.status_code in RETRY_STATUSES and attempt < self.retries:
+                                logging.warning(f"Rendering {url} returned {response.status_code}, retrying ({attempt + 1}/{self.retries})")
+                            else:
+                                response.raise_for_status()
+                                size = 0
+                                async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                                    sink.write(chunk)
+                                    size += len(chunk)
+                                self.rendered += 1
+                                return size
+                    except httpx.TransportError as e:
+                        if attempt == self.retries:
+                            raise
+                        logging.warning(f"Rendering {url} failed: {e}, retrying ({attempt + 1}/{self.retries})")
+                    await asyncio.sleep(self._delay(attempt, response))
+            except Exception:
+                self.failed += 1
+                raise
+            finally:
+                self.in_flight -= 1
+
+    async def render_to_file(self, url: str, output_path: str, file_name: str = "output.pdf", options: dict = None) -> str:
+        """Stream the PDF into `output_path/file_name`; the file only appears once complete."""
+        os.makedirs(output_path, exist_ok=True)
+        pdf_output_path = os.path.join(output_path, file_name)
+        part_path = pdf_output_path + ".part"
+        try:
+            with open(part_path, "wb") as f:
+                await self.render(url, f, options)
+            os.replace(part_path, pdf_output_path)
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+        return pdf_output_path
+
+    async def render_to_bytes(self, url: str, options: dict = None) -> bytes:
+        buffer = io.BytesIO()
+        await self.render(url, buffer, options)
+        return buffer.getvalue()
+
+    def stats(self) -> dict:
+        return {"max_renders": self.max_renders, "in_flight": self.in_flight, "rendered": self.rendered, "failed": self.failed}
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+_renderer = None
+
+
+def get_renderer() -> BrowserlessRenderer:
+    """Return the process-wide renderer, creating it on first use."""
+    global _renderer
+    if _renderer is None:
+        _renderer = BrowserlessRenderer()
+    return _renderer
+
@@ -1,113 +1,176 @@
 from src.models.profile import Profile, Experience, Education, Certificate, Language
-from src.services.browserless import browserless_pdf
-from src.utils.file_utils import sanitize_filename, save_link_to_csv, get_data_from_col_from_csv
+from src.services.browserless import get_renderer
+from src.services.extraction_spec import Spec, href, text
+from src.services.google_search import PAGE_SIZE, get_search_client
+from src.services.html_backend import parse_html
+from src.services.http_cache import get_http_cache
+from src.services.http_client import get_client, get_session
+from src.services.link_store import get_link_store
+from src.utils.file_utils import log_error
 from src.models.job_description import JobDescription
 from urllib.parse import quote
-from googleapiclient.discovery import build
+from collections import deque
+import asyncio
 import os
-import requests
-from bs4 import BeautifulSoup
 from pyppeteer import launch
 
+LISTING_WINDOW = int(os.getenv("LISTING_WINDOW", 4))
+
+TIME_TYPES = ["Full-time", "Part-time", "Internship", "Contract", "Freelance"]
+JOB_LEVELS = ["Internship", "Entry level", "Assistant", "Mid-Senior level", "Director", "Executive (VP, GM, C-Level)"]
+
+
+def _job_info(job_info):
+    """
+    Location, time type and job level from one walk over the job info rows.
+    """
+    rows = [div for div in job_info.children('div') if div.has_class('JobDescriptionRightColumn_row__5rklX')]
+    location = rows[1].text() if len(rows) > 1 else ""
+    parts = rows[0].text().split("・") if rows else [""]
+
+    time_type = parts[0] if parts[0] in TIME_TYPES else ""
+    if len(parts) > 1:
+        job_level = parts[1]
+    elif parts[0] in JOB_LEVELS:
+        job_level = parts[0]
+    else:
+        job_level = ""
+    return location, time_type, job_level
+
+
+def _work_type(root):
+    rows = root.select('div.JobDescriptionRightColumn_row__5rklX')
+    work_type = next((div for div in rows if div.select_one('li.fa-house')), None) \
+        or next((div for div in rows if div.select_one('i.fa-house')), None)
+    return work_type.text() if work_type else ""
+
+
+def _job_description(root):
+    return "".join(div.text("\n") for div in root.select('div.ContentSection_contentSection__ELRlG'))
+
+
+JOB_SPEC = Spec([
+    ('div.JobDescriptionLeftColumn_companyInfo__prhLY a.JobDescriptionLeftColumn_name__ABAp9',
+     {"Company Name": text(), "Company URL": href()}),
+    ('div.JobDescriptionRightColumn_jobInfo__9Liba', {("Location", "Time Type", "Job Level"): _job_info}),
+    ('div.JobDescriptionLeftColumn_titleRow__ld40x', {"Job Title": text()}),
+    ('div.InlineMessage_label__LJGjW', {"Date Posted": text()}),
+    (None, {"Work Type": _work_type, "Job Description": _job_description}),
+])
+
+
+def _link_resume(root):
+    menu = root.select_one('div.SidebarMenu_menu__X1VxI')
+    resume = menu.find_string('a', 'Resume') if menu else None
+    if resume is not None:
+        return resume.attr('href')
+    profile_href = root.select_one('div.UserProfilePage_headerActions__TylT_ a[rel="noreferrer noopener"]').attr('href')
+    return "https://www.cake.me/" + profile_href.split('?')[0] + "?locale=en"
+
+
+def _desired_positions(root):
+    return root.find_string('div', 'Desired positions').parent().children('div')[1].text()
+
+
+def _experience_dates(meta):
+    """
+    From date, to date and duration from one "Mar 2021 - Present・3 yrs 4 mos" meta line.
+    """
+    meta = meta.text()
+    dates = meta.split('-')
+    from_date = dates[0].strip() if meta else ""
+    to_date = dates[1].split('・')[0].strip() if len(dates) > 1 else ""
+    duration = meta.split('・')[1].strip() if '・' in meta else ""
+    return from_date, to_date, duration
+
+
+def _education_dates(meta):
+    dates = meta.text().split('-')
+    return dates[0].strip(), dates[1].strip() if len(dates) > 1 else ""
+
+
+def _education_description(item):
+    heading = item.find_string('h5', "Description")
+    description = heading.parent().text("\n") if heading else ""
+    skills = description.split("Skills: ")[1] if "Skills: " in description else ""
+    return description, skills
+
+
+PROFILE_SPEC = Spec([
+    (None, {"link_resume": _link_resume, "job_title": _desired_positions}),
+    ('h2.UserProfileHeader_name__knPil', {"name": text()}),
+    ('div.UserProfileHeader_contentSecondary__nQv3X', {"location": lambda header: header.children('div')[2].text()}),
+    ('div.UserProfileHeader_description__D9eaV', {"about": text("\n")}),
+])
+
+EXPERIENCE_SPEC = Spec([
+    ('h4.WorkExperienceListItem_title__V1121', {"position_title": text("\n")}),
+    ('a.WorkExperienceListItem_organizationName__Fnm_Q', {"institution_name": text(), "linkedin_url": href()}),
+    ('div.WorkExperienceListItem_meta__2HENv', {("from_date", "to_date", "duration"): _experience_dates}),
+    ('div.WorkExperienceListItem_locationSegments__GZbl8', {"location": text()}),
+    ('div.WorkExperienceListItem_description__mVdAF', {"description": text("\n")}),
+])
+
+EDUCATION_SPEC = Spec([
+    ('h4.EducationListItem_title__hCof4 a[rel="noreferrer noopener"]', {"institution_name": text(), "linkedin_url": href()}),
+    ('div.EducationListItem_subtitle__2k8Hg', {"degree": text()}),
+    ('div.EducationListItem_meta__YTfY5', {("from_date", "to_date"): _education_dates}),
+    (None, {("description", "skills"): _education_description}),
+])
+
+CERTIFICATE_SPEC = Spec([
+    ('div.CertificationListItem_header__75WBL', {"certificate_name": text()}),
+    ('div.CertificationListItem_subtitle__nVvbS', {"institution_name": text()}),
+    ('div.CertificationListItem_meta__hu8ie', {"cert_date": text()}),
+])
+
+
+def extract_job(html: str, backend: str = None) -> dict:
+    """
+    The job page fields, independent of the category and URL the page was crawled for.
+    """
+    return JOB_SPEC.extract(parse_html(html, backend))
+
+
 class JobDescriptionCake(JobDescription):
     def __init__(self, url: str, category: str = "N/A", file_log_name: str = "error_logs.txt"):
         super().__init__(url, category)
         self.file_log_name = file_log_name
     
-    def crawl_job(self):
-        headers = {
-            "Accept-Language": "en;p=1",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36",
-        }
-        response = requests.get(self.data["Job URL"], headers=headers, cookies={})
-        response.raise_for_status()  
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        self.get_company_info(soup)
-        self.get_job_title(soup)
-        self.get_date_posted(soup)
-        self.get_work_type(soup)
-        self.get_time_type_and_level(soup)
-        self.get_description(soup)
-        
+    def crawl_job(self, cache=None):
+        """
+        Fetch and parse the job page; pages and extracted fields go through the
+        HTTP cache unless `cache=False`.
+        """
+        cache = get_http_cache() if cache is None else cache
+        if cache:
+            return self.set_fields(cache.fetch_sync(self.data["Job URL"], get_session(), "job", extract_job))
+        response = get_session().get(self.data["Job URL"])
+        response.raise_for_status()
+        return self.parse_job(response.text)
+
+    async def acrawl_job(self, client=None, cache=None):
+        """
+        Fetch and parse the job page through the shared async client and the HTTP cache.
+        """
+        client = client or get_client()
+        cache = get_http_cache() if cache is None else cache
+        if cache:
+            return self.set_fields(await cache.fetch(self.data["Job URL"], client, "job", extract_job))
+        response = await client.get(self.data["Job URL"])
+        response.raise_for_status()
+        return self.parse_job(response.text)
+
+    def parse_job(self, html, backend=None):
+        return self.set_fields(extract_job(html, backend))
+
+    def set_fields(self, fields):
+        for field, value in fields.items():
+            self.set_field(field, value)
+
         job_detail = self.to_dict()
         return job_detail
 
-    def get_company_info(self, soup):
-        try:
-            company_name = soup.find('div', class_='JobDescriptionLeftColumn_companyInfo__prhLY').find('a', class_='JobDescriptionLeftColumn_name__ABAp9').get_text(strip=True)
-            self.set_field("Company Name", company_name)
-
-            company_url = "https://www.cake.me" + soup.find('div', class_='JobDescriptionLeftColumn_companyInfo__prhLY').find('a', class_='JobDescriptionLeftColumn_name__ABAp9').get('href')
-            self.set_field("Company URL", company_url)
-        except:
-            self.set_field("Company Name", "")
-            self.set_field("Company URL", "")
-        
-        try:
-            location = soup.find('div', class_='JobDescriptionRightColumn_jobInfo__9Liba').find_all('div', class_='JobDescriptionRightColumn_row__5rklX', recursie=False)[1].get_text(strip=True)
-            self.set_field("Location", location)
-        except:
-            self.set_field("Location", "")
-    
-    def get_job_title(self, soup):
-        try:
-            job_title = soup.find('div', class_='JobDescriptionLeftColumn_titleRow__ld40x').get_text(strip=True)
-            self.set_field("Job Title", job_title)
-        except:
-            self.set_field("Job Title", "")
-    
-    def get_date_posted(self, soup):
-        try:
-            date_posted = soup.find('div', class_='InlineMessage_label__LJGjW').get_text(strip=True)
-            self.set_field("Date Posted", date_posted)
-        except:
-            self.set_field("Date Posted", "")
-    
-    def get_work_type(self, soup):
-        try:
-            work_type = next((div for div in soup.find_all("div", class_="JobDescriptionRightColumn_row__5rklX") 
-                                    if div.find("li", class_="fa-house")), None).get_text(strip=True)
-            self.set_field("Work Type", work_type)
-        except:
-            try:
-                work_type = next((div for div in soup.find_all("div", class_="JobDescriptionRightColumn_row__5rklX") 
-                                    if div.find("i", class_="fa-house")), None).get_text(strip=True)
-                self.set_field("Work Type", work_type)
-            except:
-                self.set_field("Work Type", "")
-    
-    def get_time_type_and_level(self, soup):
-        try:
-            time_type = soup.find('div', class_='JobDescriptionRightColumn_jobInfo__9Liba').find_all('div', class_='JobDescriptionRightColumn_row__5rklX', recursive=False)[0].get_text(strip=True).split("・")[0]
-            if time_type in ["Full-time", "Part-time", "Internship", "Contract", "Freelance"]:
-                self.set_field("Time Type", time_type)
-            else:
-                self.set_field("Time Type", "")
-        except:
-            self.set_field("Time Type", "")
-        
-        try:
-            level = soup.find('div', class_='JobDescriptionRightColumn_jobInfo__9Liba').find_all('div', class_='JobDescriptionRightColumn_row__5rklX', recursive=False)[0].get_text(strip=True).split("・")[1]
-            self.set_field("Job Level", level)
-        except:
-            level = soup.find('div', class_='JobDescriptionRightColumn_jobInfo__9Liba').find_all('div', class_='JobDescriptionRightColumn_row__5rklX', recursive=False)[0].get_text(strip=True).split("・")[0]
-            if level in ["Internship", "Entry level", "Assistant", "Mid-Senior level", "Director", "Executive (VP, GM, C-Level)"]:
-                self.set_field("Job Level", level)
-            else:
-                self.set_field("Job Level", "")
-    
-    def get_description(self, soup):
-        try:
-            description = "".join(
-                                        div.get_text(strip=True, separator="\n") for div in soup.find_all('div', class_='ContentSection_contentSection__ELRlG')
-                                        )
-
-            self.set_field("Job Description", description)
-        except:
-            self.set_field("Job Description", "")
-
 class ProfileCake(Profile):
     def __init__(self, url: str, file_log_name: str = "error_logs.txt"):
         if "?locale=en" not in url:
@@ -117,266 +180,156 @@ class ProfileCake(Profile):
         self.link_resume = "N/A"
         self.file_log_name = file_log_name
     
-    def crawl_profile(self):
-        headers = {
-            "Accept-Language": "en;p=1",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36",
-        }
-        response = requests.get(self.data["linkedin_url"], headers=headers, cookies={})
-        response.raise_for_status()  
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        self.get_link_resume(soup)
-        self.get_name(soup)
-        self.get_location(soup)
-        self.get_job_title(soup)
-        self.get_about(soup)
-        self.get_experiences(soup)
-        self.get_educations(soup)
-        self.get_skills(soup)
-        self.get_languages(soup)
-        self.get_certificates(soup)
+    def crawl_profile(self, cache=None):
+        """
+        Fetch and parse the profile page; pages and parsed profiles go through
+        the HTTP cache unless `cache=False`.
+        """
+        cache = get_http_cache() if cache is None else cache
+        if cache:
+            return self.set_profile(*cache.fetch_sync(self.data["linkedin_url"], get_session(), "profile", self.parse_profile))
+        response = get_session().get(self.data["linkedin_url"])
+        response.raise_for_status()
+        return self.parse_profile(response.text)
+
+    async def acrawl_profile(self, client=None, cache=None):
+        """
+        Fetch and parse the profile page through the shared async client and the HTTP cache.
+        """
+        client = client or get_client()
+        cache = get_http_cache() if cache is None else cache
+        if cache:
+            return self.set_profile(*await cache.fetch(self.data["linkedin_url"], client, "profile", self.parse_profile))
+        response = await client.get(self.data["linkedin_url"])
+        response.raise_for_status()
+        return self.parse_profile(response.text)
+
+    def set_profile(self, data, link_resume):
+        """
+        Adopt a parsed profile, e.g. one served from the cache.
+        """
+        self.data = data
+        self.link_resume = link_resume
+        return self.to_dict(), self.link_resume
+
+    def parse_profile(self, html, backend=None):
+        root = parse_html(html, backend)
+
+        fields = PROFILE_SPEC.extract(root)
+        self.link_resume = fields.pop("link_resume")
+        for field, value in fields.items():
+            self.set_field(field, value)
+
+        for experience in EXPERIENCE_SPEC.extract_all(root, 'div.WorkExperienceList_list__NZHgH'):
+            self.add_experience(Experience(**experience))
+        for education in EDUCATION_SPEC.extract_all(root, 'div.EducationList_list__icyX6'):
+            self.add_education(Education(**education))
+        self.get_background(root)
+        for certificate in CERTIFICATE_SPEC.extract_all(root, 'div.CertificationList_list__9aoRC'):
+            self.add_certificate(Certificate(**certificate))
 
         return self.to_dict(), self.link_resume
-    
-    def get_link_resume(self, soup):
-        try:
-            link_resume = soup.find('div', class_='SidebarMenu_menu__X1VxI').find('a', string='Resume').get('href')
-            self.link_resume = link_resume
-        except:
-            try:
-                link_resume = "https://www.cake.me/" + soup.find('div', class_='UserProfilePage_headerActions__TylT_').find('a', rel='noreferrer noopener').get('href').split('?')[0] + "?locale=en"
-                self.link_resume = link_resume
-            except:
-                self.link_resume = ""
-
-    def get_name(self, soup):
-        try:
-            name = soup.find('h2', class_='UserProfileHeader_name__knPil').get_text(strip=True)
-            self.set_field("name", name)
-        except:
-            self.set_field("name", "")
-    
-    def get_location(self, soup):
-        try:
-            location = soup.find('div', class_='UserProfileHeader_contentSecondary__nQv3X').find_all('div', recursive=False)[2].get_text(strip=True)
-            self.set_field("location", location)
-        except:
-            self.set_field("location", "")
-    
-    def get_job_title(self, soup):
-        try:
-            job_title = soup.find('div', string='Desired positions').find_parent().find_all('div', recursive=False)[1].get_text(strip=True)
-            self.set_field("job_title", job_title)
-        except:
-            self.set_field("job_title", "")
-    
-    def get_about(self, soup):
-        try:
-            about = soup.find('div', class_='UserProfileHeader_description__D9eaV').get_text(strip=True, separator="\n")
-            self.set_field("about", about)
-        except:
-            self.set_field("about", "")
-    
-    def get_experiences(self, soup):
-        try:
-            divs_experience = soup.find('div', class_='WorkExperienceList_list__NZHgH').find_all('div', recursive=False)
-        except:
-            divs_experience = []
-        
-        if len(divs_experience) > 0:
-            for div_experience in divs_experience:
-                try:
-                    position_title = div_experience.find('h4', class_='WorkExperienceListItem_title__V1121').get_text(strip=True, separator="\n")
-                except:
-                    position_title = ""
-
-                try:
-                    institution_name = div_experience.find('a', class_='WorkExperienceListItem_organizationName__Fnm_Q').get_text(strip=True)
-                except:
-                    institution_name = ""
-
-                try:
-                    linkedin_url = "https://www.cake.me" + div_experience.find('a', class_='WorkExperienceListItem_organizationName__Fnm_Q').get('href')
-                except:
-                    linkedin_url = ""
-
-                try:
-                    from_date = div_experience.find('div', class_='WorkExperienceListItem_meta__2HENv').get_text(strip=True).split('-')[0].strip()
-                except:
-                    from_date = ""
-
-                try:
-                    to_date = div_experience.find('div', class_='WorkExperienceListItem_meta__2HENv').get_text(strip=True).split('-')[1].split('・')[0].strip()
-                except:
-                    to_date = ""
-
-                try:
-                    duration = div_experience.find('div', class_='WorkExperienceListItem_meta__2HENv').get_text(strip=True).split('・')[1].strip()
-                except:
-                    duration = ""
-
-                try:
-                    location = div_experience.find('div', class_='WorkExperienceListItem_locationSegments__GZbl8').get_text(strip=True)
-                except:
-                    location = ""
-
-                try:
-                    description = div_experience.find('div', class_='WorkExperienceListItem_description__mVdAF').get_text(strip=True, separator="\n")
-                except:
-                    description = ""
-
-                self.add_experience(Experience(position_title, institution_name, linkedin_url, from_date, to_date, duration, location, description))
-    
-    def get_educations(self, soup):
-        try:
-            divs_education = soup.find('div', class_='EducationList_list__icyX6').find_all('div', recursive=False)
-        except:
-            divs_education = []
-        
-        if len(divs_education) > 0:
-            for div_education in divs_education:
-                try:
-                    institution_name = div_education.find('h4', class_='EducationListItem_title__hCof4').find('a', rel='noreferrer noopener').get_text(strip=True)
-                except:
-                    institution_name = ""
-
-                try:
-                    linkedin_url = "https://www.cake.me" + div_education.find('h4', class_='EducationListItem_title__hCof4').find('a', rel='noreferrer noopener').get('href')
-                except:
-                    linkedin_url = ""
-
-                try:
-                    degree = div_education.find('div', class_='EducationListItem_subtitle__2k8Hg').get_text(strip=True)
-                except:
-                    degree = ""
-                
-                try:
-                    from_date = div_education.find('div', class_='EducationListItem_meta__YTfY5').get_text(strip=True).split('-')[0].strip()
-                except:
-                    from_date = ""
-                
-                try:
-                    to_date = div_education.find('div', class_='EducationListItem_meta__YTfY5').get_text(strip=True).split('-')[1].strip()
-                except:
-                    to_date = ""
-                
-                try: 
-                    description = div_education.find('h5', text="Description").parent.get_text(strip=True, separator="\n")
-                except:
-                    description = ""
-
-                try:
-                    skills = description.split("Skills: ")[1]
-                except:
-                    skills = ""
-                
-                self.add_education(Education(institution_name, degree, linkedin_url, from_date, to_date, description, skills))
-    
-    def get_skills(self, soup):
-        try:
-            divs_skill = soup.find('div', class_="ProfessionalBackground_itemLabel__WII9I", text="Skills").parent.find_all('div', recursive=False)[1].find('div', recursive=False)
-        except:
-            divs_skill = []
-        
-        if len(divs_skill) > 0:
-            for div_skill in divs_skill:
-                try:
-                    self.add_skill(div_skill.get_text(strip=True))
-                except:
-                    pass
-    
-    def get_languages(self, soup):
-        try:
-            divs_language = soup.find('div', class_="ProfessionalBackground_itemLabel__WII9I", text="Languages").parent.find_all('div', recursive=False)[1]
-        except:
-            divs_language = []
-        
-        if len(divs_language) > 0:
-            for div_language in divs_language:
-                try:
-                    language_name = div_language.get_text(strip=True).split('・')[0] or ""
-                    proficiency = div_language.get_text(strip=True).split('・')[1] or ""
-
-                    self.add_language(Language(language_name, proficiency))
-                except:
-                    pass
-    
-    def get_certificates(self, soup):
-        try:
-            divs_certificate = soup.find('div', class_="CertificationList_list__9aoRC").find_all('div', recursive=False)
-        except:
-            divs_certificate = []
-        
-        if len(divs_certificate) > 0:
-            for div_certificate in divs_certificate:
-                try:
-                    certificate_name = div_certificate.find('div', class_='CertificationListItem_header__75WBL').get_text(strip=True)
-                except:
-                    certificate_name = ""
-                
-                try:
-                    institution_name = div_certificate.find('div', class_='CertificationListItem_subtitle__nVvbS').get_text(strip=True)
-                except:
-                    institution_name = ""
-                
-                try:
-                    cert_date = div_certificate.find('div', class_='CertificationListItem_meta__hu8ie').get_text(strip=True)
-                except:
-                    cert_date = ""
-
-                self.add_certificate(Certificate(certificate_name, cert_date, institution_name))
-
-def crawl_job_listings(
-                            keyword: str, 
-                            location: str, 
-                            max_pages: int = 100, 
-                            max_jobs: int = 25, 
-                            file_log_name: str = "error_logs.txt"
-                        ) -> list:
-    links = []
-    url = f"https://www.cake.me/jobs/{quote(keyword)}?location_list[0]={location}" 
-
-    for page in range(1, max_pages + 1):
-        url_page = f"{url}&page={page}"
-        # Only log if file_log_name is not None
+
+    def get_background(self, root):
+        """
+        Skills and languages from a single pass over the ProfessionalBackground item labels.
+        """
+        items = {}
+        for label in root.select('div.ProfessionalBackground_itemLabel__WII9I'):
+            if label.children() or label.text() not in ("Skills", "Languages") or label.text() in items:
+                continue
+            columns = label.parent().children('div')
+            if len(columns) > 1:
+                items[label.text()] = columns[1]
+
+        skills = items["Skills"].children('div')[:1] if "Skills" in items else []
+        for div_skill in skills[0].children() if skills else []:
+            skill = div_skill.text()
+            if skill:
+                self.add_skill(skill)
+
+        for div_language in items["Languages"].children() if "Languages" in items else []:
+            parts = div_language.text().split('・')
+            if len(parts) > 1:
+                self.add_language(Language(parts[0], parts[1]))
+
+def parse_job_listing(html: str, backend: str = None) -> list:
+    """
+    Return the job links of one listing page.
+    """
+    root = parse_html(html, backend)
+    return [
+        "https://www.cake.me" + a.attr("href") + "?locale=en"
+        for a in root.select("div.JobSearchItem_container__oKoBL a.JobSearchItem_jobTitle__bu6yO[href]")
+    ]
+
+def listing_url(keyword: str, location: str, page: int) -> str:
+    return f"https://www.cake.me/jobs/{quote(keyword)}?location_list[0]={location}&page={page}"
+
+async def aiter_job_listings(
+                                    keyword: str,
+                                    location: str,
+                                    max_pages: int = 100,
+                                    max_jobs: int = 25,
+                                    file_log_name: str = "error_logs.txt",
+                                    client=None,
+                                    window: int = LISTING_WINDOW,
+                                    scheduler=None,
+                                ):
+    """
+    Yield up to max_jobs job links as their listing pages arrive.
+
+    A sliding window keeps `window` listing pages in flight through the shared
+    pooled client; links are yielded in page order, so callers can start job
+    fetches while later pages are still loading. Stops at the first empty or
+    failed page, cancelling the pages still in flight.
+
+    With a CrawlScheduler, listing pages are submitted to it ahead of queued
+    job pages, so they share its workers and per-host rate limit.
+    """
+    client = client or get_client()
+
+    async def fetch(page):
+        url_page = listing_url(keyword, location, page)
         if file_log_name:
-            from src.utils.file_utils import log_error
             log_error(f"Scraping url:  {url_page}...", file_log_name)
-        headers = {
-            "Accept-Language": "en;p=1",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36",
-        }
-
-        try:
-            response = requests.get(url_page, headers=headers, cookies={})
-            response.raise_for_status()  
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            div_tags = soup.find_all("div", class_="JobSearchItem_container__oKoBL")
-
-            # Get job links
-            hrefs = [
-                "https://www.cake.me" + a["href"] + "?locale=en" for div in div_tags 
-                for a in div.find_all("a", class_="JobSearchItem_jobTitle__bu6yO") 
-                if a.has_attr("href")
-            ]
-            if file_log_name:
-                from src.utils.file_utils import log_error
-                log_error(f"Found {len(hrefs)} job listings on page {page}.", file_log_name)
-            links.extend(hrefs)
-
-            if len(links) >= max_jobs:
-                break
+        response = await client.get(url_page)
+        response.raise_for_status()
+        return parse_job_listing(response.text)
 
-        except Exception as e:
+    seen = set()
+    pending = deque()
+    next_page = 1
+    try:
+        while len(seen) < max_jobs:
+            while len(pending) < max(window, 1) and next_page <= max_pages:
+                if scheduler is None:
+                    task = asyncio.create_task(fetch(next_page))
+                else:
+                    # ahead of job pages (priority >= 0), in page order
+                    task = scheduler.submit(listing_url(keyword, location, next_page), fetch, next_page, priority=-1)
+                pending.append((next_page, task))
+                next_page += 1
+            if not pending:
+                return
+            page, task = pending.popleft()
+            try:
+                hrefs = await task
+            except Exception as e:
+                if file_log_name:
+                    log_error(f"An error occurred: {e}", file_log_name)
+                return
             if file_log_name:
-                from src.utils.file_utils import log_error
-                log_error(f"An error occurred: {e}", file_log_name)
-            return links[:min(max_jobs, len(links))]
-    
-    return links[:min(max_jobs, len(links))]
+                log_error(f"Found {len(hrefs)} job listings on page {page}.", file_log_name)
+            if not hrefs:
+                return
+            for link in hrefs:
+                if link not in seen and len(seen) < max_jobs:
+                    seen.add(link)
+                    yield link
+    finally:
+        for _, task in pending:
+            task.cancel()
 
 async def html_to_pdf(
     link_origin: str,
@@ -385,6 +338,7 @@ async def html_to_pdf(
 ):
     """
     Convert a webpage to PDF using browserless, saving to output_folder_path.
+    The PDF is streamed to disk by the shared renderer, which caps concurrent renders.
     """
     if "?locale=en" not in url:
         url = url + "?locale=en"
@@ -392,24 +346,16 @@ async def html_to_pdf(
     # Use sanitized file name for the PDF
     from src.utils.file_utils import sanitize_filename
     file_name = sanitize_filename(link_origin)
-    pdf_output_path = browserless_pdf(url, output_folder_path, file_name)
+    pdf_output_path = await get_renderer().render_to_file(url, output_folder_path, file_name)
     print(f"PDF file {file_name} has been saved at {pdf_output_path}.")
 
 
 
 def google_search(query: str, start: str, api_key: str, search_engine_id: str) -> list:
-    try:
-        service = build("customsearch", "v1", developerKey=api_key)
-        response = service.cse().list(
-            q=query,
-            cx=search_engine_id,
-            start=start,
-            num=10  
-        ).execute()
-        return [item['link'] for item in response.get('items', [])]
-    except Exception as err:
-        print(f"An error occurred: {err}")
-        return []
+    """
+    One page of Custom Search result links, through the shared cached client.
+    """
+    return get_search_client(api_key, search_engine_id).page(query, start)
 
 def crawl_links_person_cake_google(
                                         keyword: str, 
@@ -427,41 +373,43 @@ def crawl_links_person_cake_google(
 
     # Only log if file_log_name is not None
     if file_log_name:
-        from src.utils.file_utils import log_error
         log_error(f"Searching for {query}...", file_log_name)
 
     all_links = []
-    if os.path.exists(links_person_file):
-        all_links_pre = get_data_from_col_from_csv(links_person_file, "Link")
-    else:
-        all_links_pre = []
-
-    start = 0  
-    while len(all_links) < max_links_person:
-        links = google_search(query, start, api_key, search_engine_id)
-        if not links:
-            if file_log_name:
-                from src.utils.file_utils import log_error
-                log_error("No more links found.", file_log_name)
-            break
+    seen = set()
+    # Links found by earlier searches live in an indexed store next to links_person_file
+    store = get_link_store(links_person_file)
+
+    client = get_search_client(api_key, search_engine_id)
+    start = 0
+    exhausted = False
+    while len(all_links) < max_links_person and not exhausted:
+        # Request as many result pages at once as the missing links could fill
+        n_pages = -(-(max_links_person - len(all_links)) // PAGE_SIZE)
+        starts = range(start, start + n_pages * PAGE_SIZE, PAGE_SIZE)
+        start += n_pages * PAGE_SIZE
+
+        new_links = []
+        for links in client.pages(query, starts):
+            if not links:
+                if file_log_name:
+                    log_error("No more links found.", file_log_name)
+                exhausted = True
+                break
 
-        if links:
+            links = [link.split('?')[0] + "?locale=en" for link in links]
+            known = store.known(links)
             for link in links:
-                link = link.split('?')[0] + "?locale=en"
-                
-                if link not in all_links:
-                    if link not in all_links_pre:
-                        save_link_to_csv(link, keyword, location, filename = links_person_file)  
-                        all_links.append(link)
-                        if len(all_links) >= max_links_person:
-                            break
-
-        if len(links) == 0:
-            if file_log_name:
-                from src.utils.file_utils import log_error
-                log_error("No more links found.", file_log_name)
-            break
+                if link not in known and link not in seen:
+                    seen.add(link)
+                    new_links.append(link)
+                    all_links.append(link)
+                    if len(all_links) >= max_links_person:
+                        break
+
+            if len(all_links) >= max_links_person:
+                break
 
-        start += 10
+        store.add_many(new_links, keyword, location)
 
-    return all_links[:min(max_links_person, len(all_links))]
\ No newline at end of file
+    return all_links[:min(max_links_person, len(all_links))]
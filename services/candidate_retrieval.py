@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import numpy as np
+import scipy.sparse as sp
+
+from src.models.resume_entity import ScoreFactor
+from src.services.corpus_index import CorpusIndex
+
+
+class CandidateRetriever:
+    """BM25 pre-ranking over the NER-tagged sections held by a `CorpusIndex`.
+
+    Each field of each resume is treated as one BM25 document. Postings are the
+    columns of a per-field resume x term CSC matrix, so a query only touches the
+    postings of its own terms. The shortlist is meant to be scored exactly by
+    `ResumeScorer.score_index`.
+    """
+
+    def __init__(
+        self,
+        index: CorpusIndex,
+        k1: float = 1.5,
+        b: float = 0.75,
+        field_weights: dict[str, float] | None = None,
+    ) -> None:
+        self.index = index
+        self.k1 = k1
+        self.b = b
+        self.field_weights = field_weights or {}
+        self._version = -1
+        self._ids: list[str] = []
+        self._postings: dict[str, sp.csc_matrix] = {}
+        self._length_norm: dict[str, np.ndarray] = {}
+        self._idf: dict[str, np.ndarray] = {}
+
+    def _refresh(self) -> None:
+        if self._version == self.index.version:
+            return
+        self._ids = self.index.ids
+        n_docs = len(self._ids)
+        for field in self.index.fields:
+            counts, offsets = self.index.stacked_counts(field)
+            owners = np.repeat(np.arange(n_docs), np.diff(offsets))
+            aggregate = sp.csr_matrix(
+                (np.ones(len(owners)), (owners, np.arange(len(owners)))), shape=(n_docs, counts.shape[0])
+            )
+            postings = (aggregate @ counts).tocsc()
+            doc_len = np.asarray(postings.sum(axis=1)).ravel()
+            avg_len = doc_len.mean() if n_docs and doc_len.mean() > 0 else 1.0
+            df = np.diff(postings.indptr)
+            self._postings[field] = postings
+            self._length_norm[field] = self.k1 * (1 - self.b + self.b * doc_len / avg_len)
+            self._idf[field] = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        self._version = self.index.version
+
+    def scores(self, job_description: ScoreFactor) -> np.ndarray:
+        """Return the weighted BM25 score of every indexed resume, in `index.ids` order."""
+        self._refresh()
+        scores = np.zeros(len(self._ids))
+        for field in self.index.fields:
+            terms = self.index.term_ids(getattr(job_description, field))
+            if not len(terms) or not len(self._ids):
+                continue
+            postings = self._postings[field][:, terms].tocoo()
+            tf = postings.data
+            weights = self._idf[field][terms[postings.col]] * tf * (self.k1 + 1)
+            weights /= tf + self._length_norm[field][postings.row]
+            np.add.at(scores, postings.row, self.field_weights.get(field, 1.0) * weights)
+        return scores
+
+    def shortlist(self, job_description: ScoreFactor, limit: int) -> list[str]:
+        """Return up to `limit` resume ids ranked by BM25, dropping resumes that share no term with the JD."""
+        scores = self.scores(job_description)
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        matched = matched[np.argsort(-scores[matched], kind="stable")]
+        return [self._ids[i] for i in matched]
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import json
+import os
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from src.models.resume_entity import ScoreFactor
+
+
+def weigh(counts: sp.csr_matrix, idf: np.ndarray) -> sp.csr_matrix:
+    """Apply IDF weights to term counts and L2-normalize each row."""
+    if counts.shape[0] == 0:
+        return sp.csr_matrix(counts.shape)
+    return normalize(counts @ sp.diags(idf), copy=False).tocsr()
+
+
+class CorpusIndex:
+    """Incrementally updatable TF-IDF index over the sections of many resumes.
+
+    Mirrors the vocabulary and document frequencies `ResumeScorer.fit` would
+    learn from every resume line, but keeps raw term counts per resume so
+    resumes can be added or removed without refitting the whole pool. IDF is
+    recomputed from the document frequencies at query time.
+    """
+
+    META_FILE = "meta.json"
+    ARRAYS_FILE = "arrays.npz"
+
+    def __init__(self, fields: list[str]) -> None:
+        self.fields = list(fields)
+        self.analyzer = TfidfVectorizer(stop_words="english", ngram_range=(1, 1)).build_analyzer()
+        self.vocabulary: dict[str, int] = {}
+        self.df = np.zeros(0, dtype=np.int64)
+        self.n_lines = 0
+        self.version = 0
+        self.sections: dict[str, ScoreFactor] = {}
+        self.stamps: dict[str, float] = {}
+        self._line_counts: dict[str, int] = {}
+        self._line_terms: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self._matrices: dict[str, dict[str, sp.csr_matrix]] = {}
+        self._stacked: dict[str, tuple[sp.csr_matrix, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.sections)
+
+    def __contains__(self, resume_id: str) -> bool:
+        return resume_id in self.sections
+
+    @property
+    def ids(self) -> list[str]:
+        return list(self.sections)
+
+    def _count(self, sentences: list[str], vocabulary: dict[str, int]) -> sp.csr_matrix:
+        """Count terms per sentence, growing `vocabulary` with unseen terms."""
+        indptr, indices, data = [0], [], []
+        for sentence in sentences:
+            counts: dict[int, int] = {}
+            for term in self.analyzer(sentence):
+                term_id = vocabulary.setdefault(term, len(vocabulary))
+                counts[term_id] = counts.get(term_id, 0) + 1
+            indices.extend(counts)
+            data.extend(counts.values())
+            indptr.append(len(indices))
+        return sp.csr_matrix(
+            (np.array(data, dtype=np.float64), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int32)),
+            shape=(len(sentences), len(vocabulary)),
+        )
+
+    def _grow_df(self) -> None:
+        if len(self.df) < len(self.vocabulary):
+            self.df = np.pad(self.df, (0, len(self.vocabulary) - len(self.df)))
+
+    def add(self, resume_id: str, sections: ScoreFactor, lines: list[str], stamp: float = 0.0) -> None:
+        """Add (or replace) a resume given its sections and the raw lines used for document frequencies."""
+        if resume_id in self.sections:
+            self.remove(resume_id)
+        line_matrix = self._count(lines, self.vocabulary)
+        term_ids, line_counts = np.unique(line_matrix.indices, return_counts=True)
+        self._matrices[resume_id] = {
+            field: self._count(getattr(sections, field), self.vocabulary) for field in self.fields
+        }
+        self._grow_df()
+        self.df[term_ids] += line_counts
+        self.n_lines += len(lines)
+        self.sections[resume_id] = sections
+        self.stamps[resume_id] = stamp
+        self._line_counts[resume_id] = len(lines)
+        self._line_terms[resume_id] = (term_ids.astype(np.int32), line_counts.astype(np.int64))
+        self._touch()
+
+    def remove(self, resume_id: str) -> None:
+        """Drop a resume and subtract its contribution from the document frequencies."""
+        term_ids, line_counts = self._line_terms.pop(resume_id)
+        self.df[term_ids] -= line_counts
+        self.n_lines -= self._line_counts.pop(resume_id)
+        del self.sections[resume_id], self.stamps[resume_id], self._matrices[resume_id]
+        self._touch()
+
+    def _touch(self) -> None:
+        self.version += 1
+        self._stacked = {}
+
+    def idf(self) -> np.ndarray:
+        """Smoothed IDF over the indexed lines alone, as `TfidfVectorizer` computes it."""
+        return np.log((1 + self.n_lines) / (1 + self.df)) + 1
+
+    def transform(self, sentences: list[str], idf: np.ndarray) -> sp.csr_matrix:
+        """Vectorize `sentences` against the first `len(idf)` indexed terms.
+
+        Other terms get the IDF of an unseen term and only count toward the row
+        norm, as JD-only terms do in `vectorize_query`.
+        """
+        counts = self._count(sentences, dict(self.vocabulary))
+        unseen_idf = np.full(counts.shape[1] - len(idf), np.log(1 + self.n_lines) + 1)
+        return weigh(counts, np.concatenate([idf, unseen_idf]))[:, : len(idf)].tocsr()
+
+    def vectorize_query(self, job_description: ScoreFactor) -> tuple[np.ndarray, dict[str, sp.csr_matrix]]:
+        """Compute the IDF of corpus plus JD and the normalized JD matrix of every field.
+
+        The JD sentences count as documents, as they do in `ResumeScorer.fit`.
+        JD-only terms are kept while normalizing, then sliced off since no
+        resume sentence can match them.
+        """
+        vocabulary = dict(self.vocabulary)
+        jd_dict = job_description.dict()
+        jd_lines = [text for section in jd_dict.values() if isinstance(section, list) for text in section]
+        jd_line_matrix = self._count(jd_lines, vocabulary)
+        df = np.pad(self.df, (0, len(vocabulary) - len(self.df)))
+        jd_terms, jd_counts = np.unique(jd_line_matrix.indices, return_counts=True)
+        df[jd_terms] += jd_counts
+        n_docs = self.n_lines + len(jd_lines)
+        idf = np.log((1 + n_docs) / (1 + df)) + 1
+        jd_matrices = {}
+        for field in self.fields:
+            counts = self._count(jd_dict.get(field) or [], vocabulary)
+            counts.resize((counts.shape[0], len(vocabulary)))
+            jd_matrices[field] = weigh(counts, idf)[:, : len(self.vocabulary)].tocsr()
+        return idf[: len(self.vocabulary)], jd_matrices
+
+    def field_matrix(
+        self, field: str, idf: np.ndarray, ids: list[str] | None = None
+    ) -> tuple[sp.csr_matrix, np.ndarray]:
+        """Return the normalized TF-IDF rows of every resume sentence in `field`, and row offsets per resume.
+
+        With `ids`, only those resumes are stacked, in that order.
+        """
+        if ids is not None:
+            counts, offsets = self._stack(field, ids)
+        else:
+            counts, offsets = self.stacked_counts(field)
+        return weigh(counts, idf), offsets
+
+    def _stack(self, field: str, ids: list[str]) -> tuple[sp.csr_matrix, np.ndarray]:
+        blocks = [self._matrices[resume_id][field] for resume_id in ids]
+        for block in blocks:
+            block.resize((block.shape[0], len(self.vocabulary)))
+        offsets = np.zeros(len(blocks) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([block.shape[0] for block in blocks])
+        stacked = sp.vstack(blocks, format="csr") if blocks else sp.csr_matrix((0, len(self.vocabulary)))
+        return stacked, offsets
+
+    def term_ids(self, sentences: list[str]) -> np.ndarray:
+        """Return the distinct indexed term ids occurring in `sentences`."""
+        return np.unique(
+            [self.vocabulary[term] for sentence in sentences for term in self.analyzer(sentence) if term in self.vocabulary]
+        ).astype(np.int64)
+
+    def sentence_counts(self, ids: list[str]) -> np.ndarray:
+        """Return the number of non-empty sentences per resume (rows) and field (columns)."""
+        return np.array(
+            [[np.count_nonzero(np.diff(self._matrices[resume_id][field].indptr)) for field in self.fields] for resume_id in ids]
+        ).reshape(len(ids), len(self.fields))
+
+    def stacked_counts(self, field: str) -> tuple[sp.csr_matrix, np.ndarray]:
+        """Return the raw term counts of every resume sentence in `field`, and row offsets per resume."""
+        if field not in self._stacked:
+            self._stacked[field] = self._stack(field, self.ids)
+        return self._stacked[field]
+
+    def save(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        ids = self.ids
+        arrays = {"df": self.df}
+        line_terms = [self._line_terms[resume_id] for resume_id in ids]
+        arrays["line_indptr"] = np.concatenate([[0], np.cumsum([len(t) for t, _ in line_terms])]).astype(np.int64)
+        arrays["line_indices"] = np.concatenate([t for t, _ in line_terms]) if ids else np.zeros(0, np.int32)
+        arrays["line_data"] = np.concatenate([c for _, c in line_terms]) if ids else np.zeros(0, np.int64)
+        for field in self.fields:
+            counts, offsets = self.stacked_counts(field)
+            arrays[f"{field}_data"] = counts.data
+            arrays[f"{field}_indices"] = counts.indices
+            arrays[f"{field}_indptr"] = counts.indptr
+            arrays[f"{field}_offsets"] = offsets
+        np.savez_compressed(os.path.join(path, self.ARRAYS_FILE), **arrays)
+        meta = {
+            "fields": self.fields,
+            "vocabulary": sorted(self.vocabulary, key=self.vocabulary.get),
+            "n_lines": self.n_lines,
+            "version": self.version,
+            "resumes": [
+                {
+                    "id": resume_id,
+                    "stamp": self.stamps[resume_id],
+                    "line_count": self._line_counts[resume_id],
+                    "sections": self.sections[resume_id].dict(),
+                }
+                for resume_id in ids
+            ],
+        }
+        with open(os.path.join(path, self.META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> CorpusIndex:
+        with open(os.path.join(path, cls.META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = np.load(os.path.join(path, cls.ARRAYS_FILE))
+        index = cls(meta["fields"])
+        index.vocabulary = {term: term_id for term_id, term in enumerate(meta["vocabulary"])}
+        index.df = arrays["df"]
+        index.n_lines = meta["n_lines"]
+        size = len(index.vocabulary)
+        stacked = {
+            field: (
+                sp.csr_matrix(
+                    (arrays[f"{field}_data"], arrays[f"{field}_indices"], arrays[f"{field}_indptr"]),
+                    shape=(int(arrays[f"{field}_offsets"][-1]), size),
+                ),
+                arrays[f"{field}_offsets"],
+            )
+            for field in index.fields
+        }
+        line_indptr = arrays["line_indptr"]
+        for i, resume in enumerate(meta["resumes"]):
+            resume_id = resume["id"]
+            index.sections[resume_id] = ScoreFactor(**resume["sections"])
+            index.stamps[resume_id] = resume["stamp"]
+            index._line_counts[resume_id] = resume["line_count"]
+            start, end = line_indptr[i], line_indptr[i + 1]
+            index._line_terms[resume_id] = (arrays["line_indices"][start:end], arrays["line_data"][start:end])
+            index._matrices[resume_id] = {
+                field: counts[offsets[i]: offsets[i + 1]] for field, (counts, offsets) in stacked.items()
+            }
+        index._stacked = stacked
+        index.version = meta["version"]
+        return index
@@ -0,0 +1,141 @@
+import asyncio
+import itertools
+import logging
+import time
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` requests per second on average, bursts of up to `burst`.
+    A non-positive rate disables the limit.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class CrawlScheduler:
+    """
+    Bounded-concurrency crawl scheduler.
+
+    Tasks are queued by (priority, submission order) and run by a fixed pool
+    of `concurrency` workers shared by the whole crawl. Before a task starts,
+    its host's token bucket is drained, so each host sees at most
+    `rate_per_host` requests per second (after an initial burst of `burst`).
+    Per-task failures are logged, counted in `stats()` and set on the task's
+    future; they do not stop the crawl.
+    """
+
+    def __init__(self, concurrency: int = 8, rate_per_host: float = 2.0, burst: int = 2):
+        self.concurrency = max(concurrency, 1)
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.queue = asyncio.PriorityQueue()
+        self._order = itertools.count()
+        self._buckets = {}
+        self._workers = []
+        self.started_at = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.busy_seconds = 0.0
+        self.per_host = {}
+
+    def _bucket(self, host: str) -> TokenBucket:
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate_per_host, self.burst)
+        return self._buckets[host]
+
+    def submit(self, url: str, func, *args, priority: int = 0) -> asyncio.Future:
+        """
+        Queue `func(*args)` (a coroutine function) for the host of `url`; lower priorities run first.
+
+        Returns:
+            asyncio.Future: Resolved with the task's result or exception.
+        """
+        if not self._workers:
+            self.started_at = time.monotonic()
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((priority, next(self._order), urlsplit(url).netloc, func, args, future))
+        self.submitted += 1
+        return future
+
+    async def _work(self):
+        while True:
+            _, _, host, func, args, future = await self.queue.get()
+            try:
+                if future.cancelled():
+                    continue
+                await self._bucket(host).acquire()
+                self.in_flight += 1
+                self.per_host[host] = self.per_host.get(host, 0) + 1
+                start = time.monotonic()
+                try:
+                    result = await func(*args)
+                except Exception as e:
+                    logging.error(f"Crawl task for {host} failed: {e}")
+                    self.failed += 1
+                    if not future.cancelled():
+                        future.set_exception(e)
+                else:
+                    self.completed += 1
+                    if not future.cancelled():
+                        future.set_result(result)
+                finally:
+                    self.in_flight -= 1
+                    self.busy_seconds += time.monotonic() - start
+            finally:
+                self.queue.task_done()
+
+    async def join(self):
+        """Wait until every queued task has finished."""
+        await self.queue.join()
+
+    async def close(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def stats(self) -> dict:
+        elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+        done = self.completed + self.failed
+        return {
+            "concurrency": self.concurrency,
+            "rate_per_host": self.rate_per_host,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue.qsize(),
+            "per_host": dict(self.per_host),
+            "elapsed_seconds": elapsed,
+            "avg_task_seconds": self.busy_seconds / done if done else 0.0,
+            "throughput_per_s": done / elapsed if elapsed else 0.0,
+        }
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+_PRIME = (1 << 61) - 1
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-1 of the raw file bytes, read in chunks."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def document_text(doc) -> str:
+    """Plain text of an extracted (untagged) document, one line per layout line."""
+    return "\n".join(line.text for page in doc.pages for line in page.lines)
+
+
+class Deduplicator:
+    """Exact and near-duplicate detection over resumes, run before NER.
+
+    Exact copies are caught from the file content hash without extracting
+    anything. Otherwise the extracted text is shingled into `shingle_size`-word
+    windows and summarized by a `num_perm` MinHash signature; signatures are
+    split into `bands` LSH bands, and only resumes sharing a band bucket are
+    compared. A resume whose estimated Jaccard similarity with an earlier one
+    reaches `threshold` is recorded in `duplicates` against that canonical id
+    and should not be parsed or scored.
+    """
+
+    STATE_FILE = "dedup.json"
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.seed = seed
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, 1 << 31, size=num_perm, dtype=np.uint64)
+        self.hashes: dict[str, str] = {}
+        self.keys: dict[str, str] = {}
+        self.signatures: dict[str, np.ndarray] = {}
+        self.duplicates: dict[str, str] = {}
+        self.stamps: dict[str, float] = {}
+        self._buckets: dict[tuple[int, bytes], list[str]] = {}
+        self._lock = threading.Lock()
+
+    def shingles(self, text: str) -> set[str]:
+        words = re.findall(r"\w+", text.lower())
+        if len(words) <= self.shingle_size:
+            return {" ".join(words)} if words else set()
+        return {" ".join(words[i: i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1)}
+
+    def signature(self, text: str) -> np.ndarray | None:
+        """MinHash signature of `text`, or None when it has no words."""
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        hashed = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+        return ((np.outer(self._a, hashed) + self._b[:, None]) % _PRIME).min(axis=1)
+
+    def _bands(self, signature: np.ndarray) -> list[tuple[int, bytes]]:
+        return [(band, rows.tobytes()) for band, rows in enumerate(np.split(signature, self.bands))]
+
+    def _register(self, key: str, signature: np.ndarray) -> None:
+        self.signatures[key] = signature
+        for bucket in self._bands(signature):
+            self._buckets.setdefault(bucket, []).append(key)
+
+    def match_hash(self, key: str, content_hash: str, stamp: float = 0.0) -> str | None:
+        """Return the canonical id if `content_hash` was already seen, recording `key` as its duplicate."""
+        with self._lock:
+            self.stamps[key] = stamp
+            self.duplicates.pop(key, None)
+            canonical = self.hashes.get(content_hash)
+            if canonical is not None and canonical != key:
+                self.duplicates[key] = canonical
+                return canonical
+            self.hashes[content_hash] = key
+            self.keys[key] = content_hash
+            return None
+
+    def match_text(self, key: str, text: str) -> str | None:
+        """Return the canonical id of a near-duplicate of `text`, or register `key` as a new resume."""
+        signature = self.signature(text)
+        if signature is None:
+            return None
+        with self._lock:
+            candidates = {other for bucket in self._bands(signature) for other in self._buckets.get(bucket, [])}
+            best, best_similarity = None, self.threshold
+            for other in candidates - {key}:
+                similarity = float(np.mean(self.signatures[other] == signature))
+                if similarity >= best_similarity:
+                    best, best_similarity = other, similarity
+            if best is not None:
+                self.duplicates[key] = best
+                content_hash = self.keys.pop(key, None)
+                if self.hashes.get(content_hash) == key:
+                    self.hashes[content_hash] = best
+                return best
+            self._register(key, signature)
+            return None
+
+    def forget(self, key: str) -> None:
+        """Drop `key`; duplicates of it lose their canonical and will be checked again."""
+        with self._lock:
+            self.stamps.pop(key, None)
+            self.duplicates.pop(key, None)
+            self.keys.pop(key, None)
+            for content_hash in [h for h, canonical in self.hashes.items() if canonical == key]:
+                del self.hashes[content_hash]
+            signature = self.signatures.pop(key, None)
+            if signature is not None:
+                for bucket in self._bands(signature):
+                    self._buckets[bucket].remove(key)
+                    if not self._buckets[bucket]:
+                        del self._buckets[bucket]
+            for duplicate in [d for d, canonical in self.duplicates.items() if canonical == key]:
+                del self.duplicates[duplicate]
+                self.stamps.pop(duplicate, None)
+
+    def save(self, path: str) -> None:
+        os.makedirs(path, exist_ok=True)
+        state = {
+            "threshold": self.threshold,
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "shingle_size": self.shingle_size,
+            "seed": self.seed,
+            "hashes": self.hashes,
+            "keys": self.keys,
+            "duplicates": self.duplicates,
+            "stamps": self.stamps,
+            "signatures": {key: signature.tolist() for key, signature in self.signatures.items()},
+        }
+        with open(os.path.join(path, self.STATE_FILE), "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: str) -> Deduplicator:
+        with open(os.path.join(path, cls.STATE_FILE), encoding="utf-8") as f:
+            state = json.load(f)
+        dedup = cls(state["threshold"], state["num_perm"], state["bands"], state["shingle_size"], state["seed"])
+        dedup.keys = state["keys"]
+        dedup.hashes = state["hashes"]
+        dedup.duplicates = state["duplicates"]
+        dedup.stamps = state["stamps"]
+        for key, signature in state["signatures"].items():
+            dedup._register(key, np.array(signature, dtype=np.uint64))
+        return dedup
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import json
+import os
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.cluster import KMeans
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import normalize
+
+from src.models.resume_entity import ScoreFactor
+from src.services.corpus_index import CorpusIndex
+
+
+class DenseIndex:
+    """LSA projection of a `CorpusIndex` with memory-mapped float32 sentence vectors.
+
+    A TruncatedSVD fitted on the TF-IDF of every indexed section sentence maps
+    sentences to `n_components` dimensions. Vectors are stored per field in
+    `.npy` files opened with `mmap_mode="r"`, so queries are dense matrix
+    products over pages the OS keeps cached. With `n_lists > 0`, a k-means
+    coarse quantizer over per-resume mean vectors restricts a query to the
+    resumes of the `nprobe` closest lists.
+
+    The projection is fitted once; `update` projects resumes added to the
+    corpus since then with the same components and drops removed ones, so a
+    new resume does not cost a refit. Build again to refit on the current
+    corpus.
+    """
+
+    META_FILE = "meta.json"
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(os.path.join(path, self.META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.ids: list[str] = meta["ids"]
+        self.fields: list[str] = meta["fields"]
+        self.index_version: int = meta["index_version"]
+        self.stamps: dict[str, float] = meta.get("stamps", {})
+        self.fitted: bool = meta.get("fitted", True)
+        self.idf = np.load(os.path.join(path, "idf.npy"))
+        self.components = np.load(os.path.join(path, "components.npy"))
+        self.vectors = {field: np.load(os.path.join(path, f"{field}.npy"), mmap_mode="r") for field in self.fields}
+        self.offsets = {field: np.load(os.path.join(path, f"{field}_offsets.npy")) for field in self.fields}
+        self.centroids = None
+        self.assignments = None
+        if meta["n_lists"]:
+            self.centroids = np.load(os.path.join(path, "centroids.npy"))
+            self.assignments = np.load(os.path.join(path, "assignments.npy"))
+
+    @classmethod
+    def build(
+        cls,
+        index: CorpusIndex,
+        path: str,
+        n_components: int = 128,
+        n_lists: int = 0,
+        chunk_size: int = 4096,
+        random_state: int = 0,
+    ) -> DenseIndex:
+        os.makedirs(path, exist_ok=True)
+        idf = index.idf()
+        matrices = {field: index.field_matrix(field, idf) for field in index.fields}
+        sentences = sp.vstack([matrix for matrix, _ in matrices.values()], format="csr")
+        n_components = max(1, min(n_components, sentences.shape[0] - 1, sentences.shape[1] - 1))
+        fitted = sentences.shape[0] > 0 and sentences.shape[1] >= 2
+        if fitted:
+            svd = TruncatedSVD(n_components=n_components, random_state=random_state).fit(sentences)
+            components = svd.components_.astype(np.float32)
+        else:
+            # too little to fit (no sentences, or a single term): project onto the leading terms as they are
+            components = np.eye(n_components, sentences.shape[1], dtype=np.float32)
+        np.save(os.path.join(path, "idf.npy"), idf)
+        np.save(os.path.join(path, "components.npy"), components)
+        resume_sums = np.zeros((len(index), n_components), dtype=np.float32)
+        for field, (matrix, offsets) in matrices.items():
+            np.save(os.path.join(path, f"{field}_offsets.npy"), offsets)
+            vectors_path = os.path.join(path, f"{field}.npy")
+            if matrix.shape[0] == 0:
+                np.save(vectors_path, np.zeros((0, n_components), dtype=np.float32))
+                continue
+            vectors = np.lib.format.open_memmap(
+                vectors_path, mode="w+", dtype=np.float32, shape=(matrix.shape[0], n_components)
+            )
+            owners = np.repeat(np.arange(len(index)), np.diff(offsets))
+            for start in range(0, matrix.shape[0], chunk_size):
+                block = normalize(matrix[start: start + chunk_size] @ components.T)
+                vectors[start: start + chunk_size] = block
+                np.add.at(resume_sums, owners[start: start + chunk_size], block)
+            vectors.flush()
+            del vectors
+        n_lists = min(n_lists, len(index))
+        if n_lists:
+            kmeans = KMeans(n_clusters=n_lists, n_init=1, random_state=random_state).fit(normalize(resume_sums))
+            np.save(os.path.join(path, "centroids.npy"), normalize(kmeans.cluster_centers_).astype(np.float32))
+            np.save(os.path.join(path, "assignments.npy"), kmeans.labels_.astype(np.int32))
+        meta = {
+            "ids": index.ids,
+            "fields": index.fields,
+            "index_version": index.version,
+            "stamps": index.stamps,
+            "fitted": bool(fitted),
+            "n_components": n_components,
+            "n_lists": n_lists,
+        }
+        with open(os.path.join(path, cls.META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        return cls(path)
+
+    def update(self, index: CorpusIndex, chunk_size: int = 4096) -> DenseIndex:
+        """Bring the vectors in line with `index` without refitting the projection.
+
+        Resumes added (or replaced) since the last build or update are projected
+        with the existing IDF and components, like JD sentences in `embed`;
+        removed ones are dropped. The vector files are rewritten by copying the
+        kept rows, and new resumes join the list of their closest centroid.
+        """
+        keep = np.array(
+            [resume_id in index and index.stamps[resume_id] == self.stamps.get(resume_id) for resume_id in self.ids],
+            dtype=bool,
+        )
+        kept_ids = [resume_id for resume_id, kept in zip(self.ids, keep) if kept]
+        known = set(kept_ids)
+        added = [resume_id for resume_id in index.ids if resume_id not in known]
+        n_components = self.components.shape[0]
+        # terms first seen after the fit only count toward the row norm, as in `CorpusIndex.transform`
+        unseen_idf = np.full(len(index.vocabulary) - len(self.idf), np.log(1 + index.n_lines) + 1)
+        idf = np.concatenate([self.idf, unseen_idf])
+        added_sums = np.zeros((len(added), n_components), dtype=np.float32)
+        new_offsets = {}
+        for field in self.fields:
+            offsets = self.offsets[field]
+            kept_rows = np.flatnonzero(np.repeat(keep, np.diff(offsets)))
+            matrix, added_offsets = index.field_matrix(field, idf, added)
+            matrix = matrix[:, : len(self.idf)]
+            lengths = np.concatenate([np.diff(offsets)[keep], np.diff(added_offsets)])
+            new_offsets[field] = np.concatenate([[0], np.cumsum(lengths)]).astype(offsets.dtype)
+            total = len(kept_rows) + matrix.shape[0]
+            tmp_path = os.path.join(self.path, f"{field}.tmp.npy")
+            if total == 0:
+                np.save(tmp_path, np.zeros((0, n_components), dtype=np.float32))
+                continue
+            vectors = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(total, n_components))
+            for start in range(0, len(kept_rows), chunk_size):
+                rows = kept_rows[start: start + chunk_size]
+                vectors[start: start + len(rows)] = self.vectors[field][rows]
+            owners = np.repeat(np.arange(len(added)), np.diff(added_offsets))
+            for start in range(0, matrix.shape[0], chunk_size):
+                block = normalize(matrix[start: start + chunk_size] @ self.components.T)
+                vectors[len(kept_rows) + start: len(kept_rows) + start + block.shape[0]] = block
+                np.add.at(added_sums, owners[start: start + chunk_size], block)
+            vectors.flush()
+            del vectors
+        # release the old maps before their files are replaced
+        self.vectors = {}
+        for field in self.fields:
+            os.replace(os.path.join(self.path, f"{field}.tmp.npy"), os.path.join(self.path, f"{field}.npy"))
+            np.save(os.path.join(self.path, f"{field}_offsets.npy"), new_offsets[field])
+        with open(os.path.join(self.path, self.META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["n_lists"]:
+            assignments = self.assignments[keep]
+            if added:
+                added_lists = np.argmax(normalize(added_sums) @ self.centroids.T, axis=1).astype(np.int32)
+                assignments = np.concatenate([assignments, added_lists])
+            np.save(os.path.join(self.path, "assignments.npy"), assignments)
+        meta.update(ids=kept_ids + added, index_version=index.version, stamps={
+            resume_id: index.stamps[resume_id] for resume_id in kept_ids + added
+        })
+        with open(os.path.join(self.path, self.META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        return DenseIndex(self.path)
+
+    def embed(self, index: CorpusIndex, sentences: list[str]) -> np.ndarray:
+        """Project `sentences` into the LSA space as unit float32 vectors."""
+        if not sentences:
+            return np.zeros((0, self.components.shape[0]), dtype=np.float32)
+        return normalize(index.transform(sentences, self.idf) @ self.components.T).astype(np.float32)
+
+    def probe(self, query: np.ndarray, nprobe: int) -> np.ndarray:
+        """Return the positions of the resumes in the `nprobe` lists closest to `query`."""
+        centroid_scores = self.centroids @ normalize(query.sum(axis=0, keepdims=True)).ravel()
+        lists = np.argsort(-centroid_scores)[:nprobe]
+        return np.flatnonzero(np.isin(self.assignments, lists))
+
+    def score(
+        self,
+        index: CorpusIndex,
+        job_description: ScoreFactor,
+        threshold: float = 0.0,
+        nprobe: int | None = None,
+    ) -> tuple[list[str], np.ndarray]:
+        """Return resume ids and their (resumes x fields) dense scores.
+
+        A field score is the sum, over resume sentences, of the best cosine
+        against the JD sentences of that field; bests below `threshold` (and
+        negative ones) count as zero, like the pruned TF-IDF pairs.
+        """
+        queries = {field: self.embed(index, getattr(job_description, field)) for field in self.fields}
+        positions = np.arange(len(self.ids))
+        if nprobe and self.centroids is not None:
+            positions = self.probe(np.vstack(list(queries.values())), nprobe)
+        field_scores = np.zeros((len(positions), len(self.fields)))
+        for j, field in enumerate(self.fields):
+            if not len(queries[field]) or not len(positions):
+                continue
+            offsets = self.offsets[field]
+            starts, ends = offsets[positions], offsets[positions + 1]
+            lengths = ends - starts
+            if not lengths.sum():
+                continue
+            if len(positions) == len(self.ids):
+                vectors = self.vectors[field]
+            else:
+                vectors = self.vectors[field][np.concatenate([np.arange(start, end) for start, end in zip(starts, ends)])]
+            sentence_scores = (vectors @ queries[field].T).max(axis=1)
+            sentence_scores[sentence_scores < max(threshold, 0)] = 0
+            owners = np.repeat(np.arange(len(positions)), lengths)
+            field_scores[:, j] = np.bincount(owners, weights=sentence_scores, minlength=len(positions))
+        return [self.ids[position] for position in positions], field_scores
@@ -0,0 +1,55 @@
+from src.services.html_backend import Node
+
+
+def text(separator: str = ""):
+    return lambda node: node.text(separator)
+
+
+def href(prefix: str = "https://www.cake.me"):
+    def get(node):
+        value = node.attr("href")
+        return prefix + value if value else ""
+    return get
+
+
+class Spec:
+    """
+    Declarative, single-pass extraction spec shared by the Cake page extractors.
+
+    `rules` is a list of (selector, fields) pairs. Each selector is resolved
+    once per scope (`None` means the scope node itself) and every field in
+    `fields` is computed from that one match, so fields living in the same
+    subtree (company name and URL, the from/to/duration meta line, ...) no
+    longer repeat the lookup. A field key may be a tuple of names, in which
+    case its getter returns one value per name.
+
+    A missing match, or a getter raising on unexpected markup, yields
+    `default` for its fields instead of aborting the page.
+    """
+
+    def __init__(self, rules: list, default=""):
+        self.rules = rules
+        self.default = default
+
+    def extract(self, scope: Node) -> dict:
+        result = {}
+        for selector, fields in self.rules:
+            node = scope if selector is None else scope.select_one(selector)
+            for names, getter in fields.items():
+                try:
+                    value = getter(node) if node is not None else None
+                except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+                    value = None
+                if isinstance(names, tuple):
+                    values = value if value is not None else (self.default,) * len(names)
+                    result.update(zip(names, values))
+                else:
+                    result[names] = value if value is not None else self.default
+        return result
+
+    def extract_all(self, scope: Node, container: str, tag: str = "div") -> list:
+        """
+        Apply the spec to each direct `tag` child of the first `container` match (the rows of a list).
+        """
+        found = scope.select_one(container)
+        return [self.extract(node) for node in found.children(tag)] if found else []
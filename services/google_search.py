@@ -0,0 +1,176 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+GOOGLE_SEARCH_CACHE_FILE = os.getenv("GOOGLE_SEARCH_CACHE_FILE", "data/google_search_cache.json")
+GOOGLE_SEARCH_TTL = float(os.getenv("GOOGLE_SEARCH_TTL", 7 * 24 * 3600))
+GOOGLE_SEARCH_WORKERS = int(os.getenv("GOOGLE_SEARCH_WORKERS", 4))
+# JSON file {query: [links]}; when set, searches are served from it instead of the API
+GOOGLE_SEARCH_STUB_FILE = os.getenv("GOOGLE_SEARCH_STUB_FILE", "")
+PAGE_SIZE = 10
+
+
+class CustomSearchBackend:
+    """
+    Google Custom Search JSON API. The discovery-based service is built once
+    per thread (httplib2 connections are not thread-safe) and reused.
+    """
+
+    def __init__(self, api_key: str, search_engine_id: str):
+        self.api_key = api_key
+        self.search_engine_id = search_engine_id
+        self._local = threading.local()
+
+    def _service(self):
+        if getattr(self._local, "service", None) is None:
+            from googleapiclient.discovery import build
+            self._local.service = build("customsearch", "v1", developerKey=self.api_key, cache_discovery=False)
+        return self._local.service
+
+    def __call__(self, query: str, start: int, num: int = PAGE_SIZE) -> list:
+        response = self._service().cse().list(q=query, cx=self.search_engine_id, start=start, num=num).execute()
+        return [item["link"] for item in response.get("items", [])]
+
+
+class StubSearchBackend:
+    """
+    Offline backend serving fixed result lists, for tests and local runs.
+
+    Args:
+        results (dict): query -> ordered list of result links; unknown queries return nothing.
+    """
+
+    def __init__(self, results: dict = None):
+        self.results = results or {}
+        self.calls = []
+
+    @classmethod
+    def from_file(cls, path: str):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __call__(self, query: str, start: int, num: int = PAGE_SIZE) -> list:
+        self.calls.append((query, start))
+        return list(self.results.get(query, [])[start:start + num])
+
+
+class SearchCache:
+    """
+    Persistent cache of search result pages keyed by (query, start), each entry
+    expiring `ttl` seconds after it was stored. Saved as one JSON file.
+    """
+
+    def __init__(self, path: str = GOOGLE_SEARCH_CACHE_FILE, ttl: float = GOOGLE_SEARCH_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Ignoring unreadable search cache {path}: {e}")
+
+    @staticmethod
+    def key(query: str, start: int) -> str:
+        return hashlib.sha1(json.dumps([query, start]).encode("utf-8")).hexdigest()
+
+    def get(self, query: str, start: int):
+        with self._lock:
+            entry = self.entries.get(self.key(query, start))
+            if entry is None or time.time() - entry[0] >= self.ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def put(self, query: str, start: int, links: list):
+        with self._lock:
+            self.entries[self.key(query, start)] = [time.time(), links]
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            now = time.time()
+            self.entries = {key: entry for key, entry in self.entries.items() if now - entry[0] < self.ttl}
+            data = json.dumps(self.entries)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+
+class GoogleSearchClient:
+    """
+    Reusable search client: one backend for the process, result pages cached
+    per (query, start) and several pages fetched concurrently.
+
+    Failed pages are logged, returned empty and not cached.
+    """
+
+    def __init__(self, backend, cache: SearchCache = None, max_workers: int = GOOGLE_SEARCH_WORKERS):
+        self.backend = backend
+        self.cache = cache
+        self.executor = ThreadPoolExecutor(max_workers=max(max_workers, 1))
+
+    def page(self, query: str, start: int) -> list:
+        links = self.cache.get(query, start) if self.cache else None
+        if links is not None:
+            return links
+        try:
+            links = self.backend(query, start, PAGE_SIZE)
+        except Exception as err:
+            logging.error(f"Search for {query} (start {start}) failed: {err}")
+            return []
+        if self.cache:
+            self.cache.put(query, start, links)
+        return links
+
+    def pages(self, query: str, starts) -> list:
+        """Result pages for each start offset, fetched concurrently, in the order given."""
+        results = list(self.executor.map(lambda start: self.page(query, start), starts))
+        if self.cache:
+            self.cache.save()
+        return results
+
+    def search(self, query: str, count: int, start: int = 0) -> list:
+        """
+        Up to `count` result links, requesting just enough pages at once.
+        Pages after the first empty one are ignored.
+        """
+        n_pages = max(-(-count // PAGE_SIZE), 1)
+        links = []
+        for page in self.pages(query, range(start, start + n_pages * PAGE_SIZE, PAGE_SIZE)):
+            if not page:
+                break
+            links.extend(page)
+        return links[:count]
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_search_client(api_key: str, search_engine_id: str) -> GoogleSearchClient:
+    """
+    Return the process-wide client for these credentials, creating it on first use.
+    With GOOGLE_SEARCH_STUB_FILE set, the client serves results from that file.
+    """
+    with _clients_lock:
+        key = (api_key, search_engine_id)
+        if key not in _clients:
+            if GOOGLE_SEARCH_STUB_FILE:
+                # Stubbed results stay out of the persistent cache
+                _clients[key] = GoogleSearchClient(StubSearchBackend.from_file(GOOGLE_SEARCH_STUB_FILE), SearchCache(""))
+            else:
+                _clients[key] = GoogleSearchClient(CustomSearchBackend(api_key, search_engine_id), SearchCache())
+        return _clients[key]
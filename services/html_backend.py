@@ -0,0 +1,196 @@
+import os
+from functools import lru_cache
+
+import soupsieve
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml.html
+    from lxml.cssselect import CSSSelector
+except ImportError:
+    CSSSelector = None
+
+try:
+    import lxml  # noqa: F401
+    BS4_PARSER = "lxml"
+except ImportError:
+    BS4_PARSER = "html.parser"
+
+
+class Node:
+    """
+    Backend-neutral element used by the Cake extractors.
+
+    `text(separator)` matches BeautifulSoup's `get_text(separator, strip=True)`:
+    every text piece of the subtree is stripped, empty pieces are dropped and
+    the rest joined with `separator`.
+    """
+
+    __slots__ = ("el",)
+
+    def __init__(self, el):
+        self.el = el
+
+    def select(self, selector: str) -> list:
+        raise NotImplementedError
+
+    def select_one(self, selector: str):
+        found = self.select(selector)
+        return found[0] if found else None
+
+    def children(self, tag: str = None) -> list:
+        raise NotImplementedError
+
+    def parent(self):
+        raise NotImplementedError
+
+    def text(self, separator: str = "") -> str:
+        return separator.join(piece.strip() for piece in self._strings() if piece.strip())
+
+    def _strings(self):
+        raise NotImplementedError
+
+    def attr(self, name: str):
+        raise NotImplementedError
+
+    def has_class(self, name: str) -> bool:
+        return name in (self.attr("class") or "").split()
+
+    def find_string(self, selector: str, value: str):
+        """
+        First element matching `selector` whose only content is the text `value`
+        (BeautifulSoup's `find(..., string=value)`).
+        """
+        for node in self.select(selector):
+            if not node.children() and node.text() == value:
+                return node
+        return None
+
+
+@lru_cache(maxsize=None)
+def _soupsieve(selector: str):
+    return soupsieve.compile(selector)
+
+
+class SoupNode(Node):
+    __slots__ = ()
+
+    def select(self, selector):
+        return [SoupNode(el) for el in _soupsieve(selector).select(self.el)]
+
+    def select_one(self, selector):
+        el = _soupsieve(selector).select_one(self.el)
+        return SoupNode(el) if el is not None else None
+
+    def children(self, tag=None):
+        return [SoupNode(el) for el in self.el.find_all(tag or True, recursive=False)]
+
+    def parent(self):
+        return SoupNode(self.el.parent) if self.el.parent is not None else None
+
+    def text(self, separator=""):
+        return self.el.get_text(separator, strip=True)
+
+    def _strings(self):
+        return self.el.strings
+
+    def attr(self, name):
+        value = self.el.get(name)
+        return " ".join(value) if isinstance(value, list) else value
+
+
+@lru_cache(maxsize=None)
+def _css_xpath(selector: str):
+    return CSSSelector(selector)
+
+
+class LxmlNode(Node):
+    __slots__ = ()
+
+    def select(self, selector):
+        return [LxmlNode(el) for el in _css_xpath(selector)(self.el)]
+
+    def children(self, tag=None):
+        return [LxmlNode(el) for el in self.el if isinstance(el.tag, str) and (tag is None or el.tag == tag)]
+
+    def parent(self):
+        el = self.el.getparent()
+        return LxmlNode(el) if el is not None else None
+
+    def _strings(self):
+        return self.el.xpath(".//text()")
+
+    def attr(self, name):
+        return self.el.get(name)
+
+
+class LexborNode(Node):
+    __slots__ = ()
+
+    def select(self, selector):
+        return [LexborNode(el) for el in self.el.css(selector)]
+
+    def select_one(self, selector):
+        el = self.el.css_first(selector)
+        return LexborNode(el) if el is not None else None
+
+    def children(self, tag=None):
+        return [LexborNode(el) for el in self.el.iter(include_text=False) if tag is None or el.tag == tag]
+
+    def parent(self):
+        el = self.el.parent
+        return LexborNode(el) if el is not None else None
+
+    def _strings(self):
+        return (el.text(deep=False) for el in self.el.traverse(include_text=True) if el.tag == "-text")
+
+    def attr(self, name):
+        return self.el.attributes.get(name)
+
+
+def _parse_bs4(html: str) -> Node:
+    return SoupNode(BeautifulSoup(html, BS4_PARSER))
+
+
+def _parse_lxml(html: str) -> Node:
+    return LxmlNode(lxml.html.document_fromstring(html or "<html></html>"))
+
+
+def _parse_selectolax(html: str) -> Node:
+    return LexborNode(LexborHTMLParser(html).root)
+
+
+BACKENDS = {"bs4": _parse_bs4}
+if CSSSelector is not None:
+    BACKENDS["lxml"] = _parse_lxml
+if LexborHTMLParser is not None:
+    BACKENDS["selectolax"] = _parse_selectolax
+
+HTML_PARSER_BACKEND = os.getenv(
+    "HTML_PARSER_BACKEND", next(name for name in ("selectolax", "lxml", "bs4") if name in BACKENDS)
+)
+
+
+def parse_html(html: str, backend: str = None) -> Node:
+    """
+    Parse `html` with the given backend (default: HTML_PARSER_BACKEND, the fastest installed).
+
+    CSS selectors are compiled once per process: soupsieve patterns for bs4,
+    XPath translations for lxml; selectolax matches natively with lexbor.
+
+    Args:
+        html (str): The page source.
+        backend (str): One of "selectolax", "lxml" or "bs4".
+
+    Returns:
+        Node: The document root.
+    """
+    backend = backend or HTML_PARSER_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"HTML parser backend '{backend}' is not installed; available: {sorted(BACKENDS)}")
+    return BACKENDS[backend](html)
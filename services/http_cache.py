@@ -0,0 +1,259 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", "data/http_cache")
+HTTP_CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL", 6 * 3600))
+HTTP_CACHE_MAX_MB = float(os.getenv("HTTP_CACHE_MAX_MB", 512))
+# Returned by _result when an entry's body has been evicted (or is unreadable)
+MISSING = object()
+
+
+class HttpCache:
+    """
+    On-disk cache of scraped pages with conditional revalidation.
+
+    Each URL is stored as `<sha1>.gz` (the gzip-compressed body) next to
+    `<sha1>.json` (ETag, Last-Modified, timestamps and the parsed results).
+    Within `ttl` seconds of being stored or revalidated an entry is served
+    without touching the network. After that it is revalidated with
+    If-None-Match / If-Modified-Since; a 304 keeps the stored body and, when
+    the result for the requested `kind` was cached too, skips parsing as well.
+    When the cache grows past `max_bytes`, least recently used entries are
+    evicted, never the one being written. An entry whose body or metadata
+    has gone missing is treated as a miss.
+    """
+
+    def __init__(self, directory: str = HTTP_CACHE_DIR, ttl: float = HTTP_CACHE_TTL, max_bytes: int = None):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = int(HTTP_CACHE_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self._lock = threading.Lock()
+        self._index = None
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key + suffix)
+
+    def _write(self, path: str, data: bytes):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _entries(self) -> dict:
+        """key -> [size in bytes, last used], scanned from disk on first use."""
+        if self._index is None:
+            self._index = {}
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    key = name[:-5]
+                    try:
+                        size = os.path.getsize(self._path(key, ".json")) + os.path.getsize(self._path(key, ".gz"))
+                        self._index[key] = [size, os.path.getmtime(self._path(key, ".json"))]
+                    except OSError:
+                        continue
+        return self._index
+
+    def lookup(self, url: str):
+        """The stored metadata of `url`, or None."""
+        key = self.key(url)
+        with self._lock:
+            if key not in self._entries():
+                return None
+            try:
+                with open(self._path(key, ".json"), encoding="utf-8") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                self._entries().pop(key, None)
+                return None
+            self._entries()[key][1] = time.time()
+        return meta
+
+    def fresh(self, meta: dict) -> bool:
+        return time.time() - meta["validated_at"] < self.ttl
+
+    def body(self, url: str):
+        """The stored HTML of `url`, or None when it is gone (e.g. evicted by another request)."""
+        try:
+            with open(self._path(self.key(url), ".gz"), "rb") as f:
+                return gzip.decompress(f.read()).decode("utf-8")
+        except (OSError, EOFError):
+            return None
+
+    @staticmethod
+    def validators(meta: dict) -> dict:
+        """Conditional request headers for a stored entry."""
+        headers = {}
+        if meta and meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta and meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def _save_meta(self, key: str, meta: dict, body_size: int = None):
+        data = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            if body_size is None:
+                try:
+                    body_size = os.path.getsize(self._path(key, ".gz"))
+                except OSError:
+                    # evicted meanwhile: don't leave metadata behind without its body
+                    self._drop(key)
+                    return
+            self._write(self._path(key, ".json"), data)
+            self._entries()[key] = [len(data) + body_size, time.time()]
+            self._evict(keep=key)
+
+    def store(self, url: str, text: str, headers) -> dict:
+        """Store a 200 response; previously parsed results are dropped with the old body."""
+        key = self.key(url)
+        body = gzip.compress(text.encode("utf-8"), compresslevel=6)
+        with self._lock:
+            self._write(self._path(key, ".gz"), body)
+        now = time.time()
+        meta = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "stored_at": now,
+            "validated_at": now,
+            "results": {},
+        }
+        self._save_meta(key, meta, len(body))
+        return meta
+
+    def refresh(self, url: str, meta: dict, headers) -> dict:
+        """Mark an entry revalidated by a 304, picking up any new validators."""
+        meta["validated_at"] = time.time()
+        meta["etag"] = headers.get("ETag") or meta.get("etag")
+        meta["last_modified"] = headers.get("Last-Modified") or meta.get("last_modified")
+        self._save_meta(self.key(url), meta)
+        return meta
+
+    def _drop(self, key: str):
+        self._entries().pop(key, None)
+        for suffix in (".json", ".gz"):
+            try:
+                os.remove(self._path(key, suffix))
+            except OSError:
+                pass
+
+    def _evict(self, keep: str = None):
+        entries = self._entries()
+        total = sum(size for size, _ in entries.values())
+        for key in sorted(entries, key=lambda k: entries[k][1]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= entries[key][0]
+            self._drop(key)
+
+    def _result(self, url: str, meta: dict, kind: str, parse, text: str = None):
+        """The parsed (or raw) page, or MISSING when the stored body it needs is gone."""
+        if parse is not None and kind and kind in meta["results"]:
+            return meta["results"][kind]
+        if text is None:
+            text = self.body(url)
+            if text is None:
+                return MISSING
+        if parse is None:
+            return text
+        result = parse(text)
+        if kind:
+            meta["results"][kind] = result
+            self._save_meta(self.key(url), meta)
+        return result
+
+    def _cached(self, url: str, kind: str, parse):
+        """(meta, result) where result is MISSING unless a fresh entry could serve it."""
+        meta = self.lookup(url)
+        if meta is not None and self.fresh(meta):
+            result = self._result(url, meta, kind, parse)
+            if result is not MISSING:
+                self.hits += 1
+                return meta, result
+            # the body is gone: fetch unconditionally
+            meta = None
+        return meta, MISSING
+
+    def _response(self, url: str, meta: dict, response, kind: str, parse):
+        """The result of a GET; MISSING when a 304 arrived for a body evicted while it was awaited."""
+        if response.status_code == 304 and meta is not None:
+            self.revalidated += 1
+            return self._result(url, self.refresh(url, meta, response.headers), kind, parse)
+        response.raise_for_status()
+        self.misses += 1
+        meta = self.store(url, response.text, response.headers)
+        return self._result(url, meta, kind, parse, response.text)
+
+    async def fetch(self, url: str, client, kind: str = None, parse=None):
+        """
+        GET `url` through the cache with an async client.
+
+        Args:
+            url (str): The page URL.
+            client: An HttpClient (or anything with an async `get(url, headers=...)`).
+            kind (str): Name under which `parse`'s result is cached; its result must be JSON-serializable.
+            parse: Called with the page HTML; when omitted the HTML itself is returned.
+
+        Returns:
+            The parsed result, or the page HTML.
+        """
+        meta, result = self._cached(url, kind, parse)
+        if result is not MISSING:
+            return result
+        response = await client.get(url, headers=self.validators(meta))
+        result = self._response(url, meta, response, kind, parse)
+        if result is MISSING:
+            result = self._response(url, None, await client.get(url), kind, parse)
+        return result
+
+    def fetch_sync(self, url: str, session, kind: str = None, parse=None):
+        """Same as `fetch` with a blocking requests session."""
+        meta, result = self._cached(url, kind, parse)
+        if result is not MISSING:
+            return result
+        response = session.get(url, headers=self.validators(meta))
+        result = self._response(url, meta, response, kind, parse)
+        if result is MISSING:
+            result = self._response(url, None, session.get(url), kind, parse)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._entries()
+            return {
+                "entries": len(entries),
+                "bytes": sum(size for size, _ in entries.values()),
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+            }
+
+
+_cache = None
+
+
+def get_http_cache():
+    """Return the process-wide page cache, or None when HTTP_CACHE_DIR is set empty."""
+    global _cache
+    if _cache is None and HTTP_CACHE_DIR:
+        try:
+            _cache = HttpCache()
+        except OSError as e:
+            logging.warning(f"HTTP cache disabled, cannot use {HTTP_CACHE_DIR}: {e}")
+            return None
+    return _cache
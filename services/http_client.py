@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import random
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_HEADERS = {
+    "Accept-Language": "en;p=1",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/117.0.0.0 Safari/537.36",
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HttpClient:
+    """
+    Shared async HTTP client for the scrapers.
+
+    One pooled httpx.AsyncClient keeps connections alive (HTTP/2 when the h2
+    package is installed), so pages of the same host reuse TLS sessions. Each
+    host gets at most `per_host` requests in flight. Transport errors and
+    429/5xx responses are retried `retries` times with jittered exponential
+    backoff, honoring Retry-After when the server sends it.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 30.0,
+        connect_timeout: float = 10.0,
+        max_connections: int = 32,
+        per_host: int = 6,
+        retries: int = 3,
+        backoff: float = 0.5,
+        headers: dict = None,
+        http2: bool = None,
+    ):
+        self.client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE if http2 is None else http2,
+            headers=headers or DEFAULT_HEADERS,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            follow_redirects=True,
+        )
+        self.per_host = per_host
+        self.retries = retries
+        self.backoff = backoff
+        self._hosts = {}
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return self._hosts[host]
+
+    def _delay(self, attempt: int, response: httpx.Response = None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * 2 ** attempt * (1 + random.random())
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request with retries; the final response is returned whatever its status."""
+        for attempt in range(self.retries + 1):
+            response = None
+            try:
+                async with self._host_slot(url):
+                    response = await self.client.request(method, url, **kwargs)
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+                logging.warning(f"{method} {url} returned {response.status_code}, retrying ({attempt + 1}/{self.retries})")
+            except httpx.TransportError as e:
+                if attempt == self.retries:
+                    raise
+                logging.warning(f"{method} {url} failed: {e}, retrying ({attempt + 1}/{self.retries})")
+            await asyncio.sleep(self._delay(attempt, response))
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+
+_client = None
+_session = None
+
+
+def get_client() -> HttpClient:
+    """Return the process-wide async client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = HttpClient()
+    return _client
+
+
+def get_session() -> requests.Session:
+    """Return a process-wide keep-alive requests session for the synchronous code paths."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.headers.update(DEFAULT_HEADERS)
+    return _session
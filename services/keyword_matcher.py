@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import re
+from collections import deque
+
+from src.models.resume_entity import KeywordScore, ScoreFactor
+
+
+def normalize_phrase(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+class KeywordMatcher:
+    """Aho–Corasick automaton over the exact phrases of a job description.
+
+    Every phrase of the selected JD fields, plus its synonyms, is compiled once;
+    a resume is then scanned in a single pass over its sections of the same
+    fields, sentence by sentence, whatever the number of phrases. Matches must sit on word boundaries, so
+    "java" does not fire inside "javascript".
+    """
+
+    def __init__(
+        self,
+        job_description: ScoreFactor,
+        fields: tuple[str, ...] = ("hardskill", "language"),
+        synonyms: dict[str, list[str]] | None = None,
+    ) -> None:
+        self.fields = fields
+        synonyms = {normalize_phrase(key): value for key, value in (synonyms or {}).items()}
+        self.phrases: list[tuple[str, str]] = []
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[tuple[int, int]]] = [[]]
+        for field in fields:
+            for phrase in dict.fromkeys(normalize_phrase(p) for p in getattr(job_description, field)):
+                if not phrase:
+                    continue
+                phrase_id = len(self.phrases)
+                self.phrases.append((field, phrase))
+                for surface in {phrase, *(normalize_phrase(s) for s in synonyms.get(phrase, []))}:
+                    if surface:
+                        self._insert(surface, phrase_id)
+        self._build()
+
+    def _insert(self, surface: str, phrase_id: int) -> None:
+        state = 0
+        for char in surface:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[state][char] = len(self._goto) - 1
+            state = self._goto[state][char]
+        self._out[state].append((phrase_id, len(surface)))
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                if state:
+                    fallback = self._fail[state]
+                    while fallback and char not in self._goto[fallback]:
+                        fallback = self._fail[fallback]
+                    self._fail[child] = self._goto[fallback].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def find(self, text: str) -> list[int]:
+        """Return the phrase id of every word-bounded match in `text`."""
+        text = normalize_phrase(text)
+        matches = []
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for phrase_id, length in self._out[state]:
+                start = end - length + 1
+                if (start == 0 or not text[start - 1].isalnum()) and (end + 1 == len(text) or not text[end + 1].isalnum()):
+                    matches.append(phrase_id)
+        return matches
+
+    def score(self, resume: ScoreFactor) -> KeywordScore:
+        """Count phrase matches in the resume's sections of the selected fields.
+
+        Each sentence is scanned on its own, so a phrase never matches across a
+        sentence boundary; coverage is the share of a field's phrases found.
+        """
+        keyword_score = KeywordScore(id=resume.id, name=resume.name)
+        for sentence in (sentence for field in self.fields for sentence in getattr(resume, field)):
+            for phrase_id in self.find(sentence):
+                field, phrase = self.phrases[phrase_id]
+                counts = keyword_score.matches.setdefault(field, {})
+                counts[phrase] = counts.get(phrase, 0) + 1
+        for field in self.fields:
+            total = sum(1 for phrase_field, _ in self.phrases if phrase_field == field)
+            if total:
+                keyword_score.coverage[field] = len(keyword_score.matches.get(field, {})) / total
+        keyword_score.total = sum(keyword_score.coverage.values())
+        return keyword_score
@@ -0,0 +1,137 @@
+import csv
+import os
+import sqlite3
+import threading
+import time
+
+CSV_COLUMNS = ["Keyword", "Location", "Level", "Link"]
+
+
+class LinkStore:
+    """
+    SQLite store of crawled profile links.
+
+    `link` is the primary key, so membership checks and inserts stay
+    logarithmic however long the crawl history grows, and a (keyword, location)
+    index serves lookups by search. Links are inserted in batches, one
+    transaction per batch. The legacy links_person.csv format can be imported
+    and exported.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS links ("
+            "link TEXT PRIMARY KEY, keyword TEXT, location TEXT, level TEXT, added_at REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS links_search ON links (keyword, location)")
+        self.conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM links").fetchone()[0]
+
+    def __contains__(self, link: str) -> bool:
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM links WHERE link = ?", (link,)).fetchone() is not None
+
+    def known(self, links) -> set:
+        """The subset of `links` already stored, in one query per 500 links."""
+        links = list(links)
+        found = set()
+        with self._lock:
+            for i in range(0, len(links), 500):
+                chunk = links[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(f"SELECT link FROM links WHERE link IN ({placeholders})", chunk)
+                found.update(row[0] for row in rows)
+        return found
+
+    def add_many(self, links, keyword: str = None, location: str = None, level: str = None) -> int:
+        """
+        Insert links with the search they came from; already stored links are left as they were.
+
+        Returns:
+            int: The number of links actually inserted.
+        """
+        now = time.time()
+        rows = [(link, keyword or "", location or "", level or "", now) for link in links]
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany("INSERT OR IGNORE INTO links VALUES (?, ?, ?, ?, ?)", rows)
+            return self.conn.total_changes - before
+
+    def add(self, link: str, keyword: str = None, location: str = None, level: str = None) -> bool:
+        return self.add_many([link], keyword, location, level) == 1
+
+    def find(self, keyword: str = None, location: str = None) -> list:
+        """Links stored for a keyword and/or location, oldest first."""
+        query, params = "SELECT link FROM links", []
+        conditions = []
+        if keyword is not None:
+            conditions.append("keyword = ?")
+            params.append(keyword)
+        if location is not None:
+            conditions.append("location = ?")
+            params.append(location)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        with self._lock:
+            return [row[0] for row in self.conn.execute(query + " ORDER BY added_at, rowid", params)]
+
+    def import_csv(self, csv_path: str) -> int:
+        """Load a links_person.csv file (Keyword, Location, Level, Link); returns the links added."""
+        added = 0
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            batch = []
+            for row in csv.DictReader(f):
+                if row.get("Link"):
+                    batch.append(row)
+                if len(batch) >= 10000:
+                    added += self._import_rows(batch)
+                    batch = []
+            added += self._import_rows(batch)
+        return added
+
+    def _import_rows(self, rows: list) -> int:
+        now = time.time()
+        values = [(row["Link"], row.get("Keyword", ""), row.get("Location", ""), row.get("Level", ""), now) for row in rows]
+        with self._lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany("INSERT OR IGNORE INTO links VALUES (?, ?, ?, ?, ?)", values)
+            return self.conn.total_changes - before
+
+    def export_csv(self, csv_path: str):
+        """Write every link in the links_person.csv format."""
+        with self._lock, open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_COLUMNS)
+            writer.writerows(self.conn.execute("SELECT keyword, location, level, link FROM links ORDER BY added_at, rowid"))
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_link_store(csv_path: str) -> LinkStore:
+    """
+    The store kept next to a links CSV (data/links_person.csv -> data/links_person.db),
+    importing the CSV the first time the database is created.
+    """
+    db_path = os.path.splitext(csv_path)[0] + ".db"
+    with _stores_lock:
+        if db_path not in _stores:
+            is_new = not os.path.exists(db_path)
+            store = LinkStore(db_path)
+            if is_new and os.path.exists(csv_path):
+                store.import_csv(csv_path)
+            _stores[db_path] = store
+        return _stores[db_path]
@@ -70,10 +70,15 @@ class PdfParser:
         onnx_model = onnx.load(model_path)
         onnx.checker.check_model(onnx_model)
 
+    def extract(self, pdf_path: str):
+        return (self.pdf_processor.extract_text_and_coordinates(pdf_path)
+                if pdf_path.endswith(".pdf")
+                else self.ocr_processor.extract_text_and_coordinates(pdf_path))
+
     def preprocess_input(self, pdf_path: str, max_length: int) -> tuple:
-        doc = (self.pdf_processor.extract_text_and_coordinates(pdf_path)
-               if pdf_path.endswith(".pdf")
-               else self.ocr_processor.extract_text_and_coordinates(pdf_path))
+        return self.tokenize(self.extract(pdf_path), max_length)
+
+    def tokenize(self, doc, max_length: int) -> tuple:
         max_height, max_width = 1, 1
         doc_dict = doc.dict()
         encoding_list, list_inputs = [], []
@@ -174,13 +179,15 @@ class PdfParser:
         try:
             list_encoding, list_tokenized_word_masks, doc = self.preprocess_input(pdf_path, max_length)
             list_predictions = self.inference_model(list_encoding)
-            list_true_preds = self.get_labels(list_predictions, list_tokenized_word_masks)
-            doc = self._fill_tags(doc, list_true_preds)
-            return doc
+            return self.label(doc, list_predictions, list_tokenized_word_masks)
         except Exception as e:
             logging.error(f"Error parsing {pdf_path}: {e}")
             raise
 
+    def label(self, doc: Document, list_predictions: list[np.ndarray], list_masks: list[list]) -> Document:
+        list_true_preds = self.get_labels(list_predictions, list_masks)
+        return self._fill_tags(doc, list_true_preds)
+
     def visualize_on_pdf(self, document: Document, pdf_path: str) -> bytes:
         pdf_document = fitz.open(pdf_path)
         extracted_page_number = 0
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator
+
+_DONE = object()
+
+
+class Stage:
+    """One step of a `Pipeline`: a function run by its own pool of worker threads.
+
+    Items arrive through a bounded queue, so a slow stage blocks the stage in
+    front of it instead of letting work pile up in memory. A function that
+    returns None drops the item.
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1, maxsize: int = 8) -> None:
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self.processed = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.started_at = 0.0
+        self._alive = 0
+        self._lock = threading.Lock()
+
+    def stats(self) -> dict[str, Any]:
+        elapsed = time.perf_counter() - self.started_at if self.started_at else 0.0
+        return {
+            "stage": self.name,
+            "workers": self.workers,
+            "queue_depth": self.queue.qsize(),
+            "processed": self.processed,
+            "errors": self.errors,
+            "throughput_per_s": self.processed / elapsed if elapsed else 0.0,
+            "busy_seconds": self.busy_seconds,
+        }
+
+    def _work(self, downstream: queue.Queue, downstream_workers: int) -> None:
+        while True:
+            item = self.queue.get()
+            if item is _DONE:
+                with self._lock:
+                    self._alive -= 1
+                    last = self._alive == 0
+                if last:
+                    for _ in range(downstream_workers):
+                        downstream.put(_DONE)
+                return
+            start = time.perf_counter()
+            try:
+                result = self.func(item)
+            except Exception as e:
+                logging.error(f"Stage {self.name} failed: {e}")
+                result = None
+                with self._lock:
+                    self.errors += 1
+            with self._lock:
+                self.processed += 1
+                self.busy_seconds += time.perf_counter() - start
+            if result is not None:
+                downstream.put(result)
+
+
+class Pipeline:
+    """Chain of `Stage`s connected by bounded queues, consumed as an iterator.
+
+    I/O-bound and CPU-bound stages overlap: while one file is in inference the
+    next is being extracted and the previous one reduced.
+    """
+
+    def __init__(self, stages: list[Stage], maxsize: int = 8) -> None:
+        self.stages = stages
+        self.output: queue.Queue = queue.Queue(maxsize=maxsize)
+
+    def stats(self) -> list[dict[str, Any]]:
+        return [stage.stats() for stage in self.stages]
+
+    def run(self, items: Iterable[Any]) -> Iterator[Any]:
+        threads = []
+        downstreams = [(stage.queue, stage.workers) for stage in self.stages[1:]] + [(self.output, 1)]
+        for stage, downstream in zip(self.stages, downstreams):
+            stage.started_at = time.perf_counter()
+            stage._alive = stage.workers
+            for _ in range(stage.workers):
+                thread = threading.Thread(target=stage._work, args=downstream, daemon=True)
+                thread.start()
+                threads.append(thread)
+
+        def feed() -> None:
+            for item in items:
+                self.stages[0].queue.put(item)
+            for _ in range(self.stages[0].workers):
+                self.stages[0].queue.put(_DONE)
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        while True:
+            result = self.output.get()
+            if result is _DONE:
+                break
+            yield result
+        feeder.join()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Any
+
+from src.models.resume_entity import ScoreFactor
+from src.utils.file_utils import sanitize_filename
+
+PROFILE_SUFFIX = ".profile.json"
+MISSING = {"", "N/A"}
+
+
+def profile_path(resume_dir: str, link: str) -> str:
+    """Where the structured profile crawled from `link` is kept in `resume_dir` (next to its PDF, if rendered)."""
+    return os.path.join(resume_dir, os.path.splitext(sanitize_filename(link))[0] + PROFILE_SUFFIX)
+
+
+def is_profile(path: str) -> bool:
+    return path.endswith(PROFILE_SUFFIX)
+
+
+def save_profile(profile: dict[str, Any], resume_dir: str, link: str) -> str:
+    """Write a `Profile.to_dict()` into `resume_dir` so it can be ranked without a PDF."""
+    os.makedirs(resume_dir, exist_ok=True)
+    path = profile_path(resume_dir, link)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _text(*parts: Any) -> str:
+    return " ".join(str(part).strip() for part in parts if part is not None and str(part).strip() not in MISSING)
+
+
+def _lines(text: Any) -> list[str]:
+    return [line.strip() for line in str(text or "").split("\n") if line.strip() not in MISSING]
+
+
+def profile_sections(profile: dict[str, Any], resume_id: str) -> tuple[ScoreFactor, list[str]]:
+    """Map a `Profile.to_dict()` onto the sections NER would have recovered from its PDF.
+
+    Skills and certificates count as hard skills; each experience, education,
+    language and project contributes a heading sentence plus its description
+    lines. The returned lines (every section sentence plus the headline and
+    about text) feed the corpus document frequencies like a PDF's text lines.
+    """
+    experience = []
+    for item in profile.get("experiences", []):
+        experience.append(_text(item.get("position_title"), item.get("institution_name")))
+        experience.extend(_lines(item.get("description")))
+    education = []
+    for item in profile.get("educations", []):
+        education.append(_text(item.get("degree"), item.get("institution_name")))
+        education.extend(_lines(item.get("description")))
+    project = []
+    for item in profile.get("projects", []):
+        project.append(_text(item.get("project_name"), item.get("institution_name")))
+        project.extend(_lines(item.get("description")))
+    sections = ScoreFactor(
+        id=resume_id,
+        name=_text(profile.get("name")),
+        location=_text(profile.get("location")),
+        job_title=_text(profile.get("job_title")),
+        hardskill=[_text(skill) for skill in profile.get("skills", [])]
+        + [_text(item.get("certificate_name")) for item in profile.get("certificates", [])],
+        education=education,
+        experience=experience,
+        language=[_text(item.get("language_name"), item.get("proficiency")) for item in profile.get("languages", [])],
+        project=project,
+    )
+    for field in ("hardskill", "education", "experience", "language", "project"):
+        setattr(sections, field, [sentence for sentence in getattr(sections, field) if sentence])
+    lines = [sections.job_title, *_lines(profile.get("about"))] + [
+        sentence
+        for field in ("hardskill", "education", "experience", "language", "project")
+        for sentence in getattr(sections, field)
+    ]
+    return sections, [line for line in lines if line]
+
+
+def load_profile(path: str) -> tuple[ScoreFactor, list[str]]:
+    with open(path, encoding="utf-8") as f:
+        return profile_sections(json.load(f), path)
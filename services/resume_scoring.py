@@ -2,14 +2,35 @@ from __future__ import annotations
 
 import io
 import os
+import heapq
 import logging
+import sys
+import time
+from typing import Iterable, Iterator
 
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+import scipy.sparse as sp
 from sklearn.feature_extraction.text import TfidfVectorizer
 
-from src.models.resume_entity import PdfMetadata, ScoreFactor, Score
+from src.models.resume_entity import Explanation, KeywordScore, PdfMetadata, ScoreFactor, Score, SentenceMatch
+from src.services.candidate_retrieval import CandidateRetriever
+from src.services.corpus_index import CorpusIndex
+from src.services.dedup import Deduplicator, document_text, file_hash
+from src.services.dense_index import DenseIndex
+from src.services.keyword_matcher import KeywordMatcher
 from src.services.pdf_parser import PdfParser
+from src.services.pipeline import Pipeline, Stage
+from src.services.profile_sections import PROFILE_SUFFIX, is_profile, load_profile
+from src.services.score_cache import LRUCache, field_key
+from src.services.similarity import max_similarity, max_similarity_blocks
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PIPELINE_WORKERS = {"extract": 2, "tokenize": 1, "infer": 2, "upload": 4, "reduce": 1}
+SCORE_METADATA = {"id", "save_path", "email", "phone", "location", "name", "job_title"}
 
 def get_content_type(filename: str) -> str:
     ext = os.path.splitext(filename)[1].lower()
@@ -42,12 +63,68 @@ def upload_pdf_binary(
         logging.error(f"Error uploading PDF: {e}")
         return None
 
+def peak_rss_mb() -> float | None:
+    """Peak resident set size of this process in MB, or None where `resource` is unavailable.
+
+    ru_maxrss is in KB on Linux and in bytes on macOS.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+def format_mb(value: float | None) -> str:
+    return f"{value:.1f} MB" if value is not None else "n/a"
+
+def log_duplicates(dedup: Deduplicator | None) -> None:
+    if dedup is not None and dedup.duplicates:
+        logging.info(f"Skipped {len(dedup.duplicates)} duplicate resumes: {dedup.duplicates}")
+
+def list_resumes(resume_dir: str) -> dict[str, float]:
+    """Files of `resume_dir` to rank, with their mtimes.
+
+    A structured Cake profile (`*.profile.json`) stands in for the PDF rendered
+    from the same page, so a candidate crawled both ways is only ranked once.
+    Files still being written (`.part`, `.tmp`) are left out.
+    """
+    resume_paths = {}
+    for entry in os.scandir(resume_dir):
+        # skip files still being written (PDF renders, profile saves)
+        if not entry.name.endswith((".part", ".tmp")):
+            resume_paths[entry.path] = entry.stat().st_mtime
+    for resume_path in list(resume_paths):
+        if is_profile(resume_path):
+            resume_paths.pop(resume_path[: -len(PROFILE_SUFFIX)] + ".pdf", None)
+    return resume_paths
+
+def top_order(totals: np.ndarray, top_k: int | None = None) -> np.ndarray:
+    """Row positions of the `top_k` best totals (all rows if None), best first, ties by position."""
+    if top_k and top_k < len(totals):
+        candidates = np.argpartition(-totals, top_k - 1)[:top_k]
+        # keep every row tied with the k-th total so the stable sort picks the earliest ones
+        candidates = np.flatnonzero(totals >= totals[candidates].min())
+        return candidates[np.argsort(-totals[candidates], kind="stable")][:top_k]
+    return np.argsort(-totals, kind="stable")[:top_k]
+
+def sentence_matches(sentences: list[str], scores: np.ndarray, jd_indices: np.ndarray) -> list[SentenceMatch]:
+    return [
+        SentenceMatch(sentence=sentence, score=float(score), jd_index=int(jd_index) if score > 0 else -1)
+        for sentence, score, jd_index in zip(sentences, scores, jd_indices)
+    ]
+
 class ResumeScorer:
     def __init__(
         self,
         pdf_parser: PdfParser,
         max_length: int = 512,
+        index: CorpusIndex | None = None,
+        field_weights: dict[str, float] | None = None,
+        normalize: bool = False,
     ) -> None:
+        """`field_weights` scales each field in the total (1.0 by default); with
+        `normalize`, a field score is divided by the resume's sentence count in
+        that field, so totals measure match quality rather than resume length.
+        """
         self.vectorizer = TfidfVectorizer(stop_words="english", ngram_range=(1, 1))
         self.pdf_parser = pdf_parser
         self.info_to_score = {
@@ -59,33 +136,50 @@ class ResumeScorer:
             "B-Project": "project",
         }
         self.max_length = max_length
+        self.field_weights = field_weights or {}
+        self.normalize = normalize
+        self.index = index if index is not None else CorpusIndex(list(self.info_to_score.values()))
+        self.retriever = CandidateRetriever(self.index)
+        self.dense: DenseIndex | None = None
+        self.pipeline: Pipeline | None = None
+        self.dedup = Deduplicator()
+        self.field_cache = LRUCache()
+
+    def extract_sections(self, resume_doc: PdfMetadata) -> tuple[ScoreFactor, list[str]]:
+        lines = []
+        resume_section_mapping = {key: [] for key in self.info_to_score.values()}
+        resume_section_mapping.update({"id": resume_doc.id, "email": "", "phone": "", "name": "", "location": ""})
+        for page in resume_doc.data.pages:
+            for line in page.lines:
+                lines.append(line.text)
+                line_section_mapping = {}
+                for word in line.words:
+                    if word.ner_tag == "B-Email":
+                        resume_section_mapping["email"] += " " + word.text
+                    elif word.ner_tag == "B-Phone":
+                        resume_section_mapping["phone"] += " " + word.text
+                    elif word.ner_tag == "B-Name":
+                        resume_section_mapping["name"] += " " + word.text
+                    elif word.ner_tag == "B-Address":
+                        resume_section_mapping["location"] += " " + word.text
+                    if word.ner_tag in self.info_to_score:
+                        line_section_mapping.setdefault(word.ner_tag, []).append(word.text)
+                for key, value in line_section_mapping.items():
+                    resume_section_mapping[self.info_to_score[key]].append(" ".join(value))
+        return ScoreFactor(**resume_section_mapping), lines
 
     def fit(
-        self, resumes_list: list[PdfMetadata], job_description: ScoreFactor
+        self,
+        resumes_list: list[PdfMetadata],
+        job_description: ScoreFactor,
+        profiles: list[tuple[ScoreFactor, list[str]]] | None = None,
     ) -> list[ScoreFactor]:
+        """Fit the vectorizer on every resume line and the JD; `profiles` are already-sectioned resumes."""
         all_lines = []
         resumes_sections_list = []
-        for resume_doc in resumes_list:
-            resume_section_mapping = {key: [] for key in self.info_to_score.values()}
-            resume_section_mapping.update({"id": resume_doc.id, "email": "", "phone": "", "name": "", "location": ""})
-            for page in resume_doc.data.pages:
-                for line in page.lines:
-                    all_lines.append(line.text)
-                    line_section_mapping = {}
-                    for word in line.words:
-                        if word.ner_tag == "B-Email":
-                            resume_section_mapping["email"] += " " + word.text
-                        elif word.ner_tag == "B-Phone":
-                            resume_section_mapping["phone"] += " " + word.text
-                        elif word.ner_tag == "B-Name":
-                            resume_section_mapping["name"] += " " + word.text
-                        elif word.ner_tag == "B-Address":
-                            resume_section_mapping["location"] += " " + word.text
-                        if word.ner_tag in self.info_to_score:
-                            line_section_mapping.setdefault(word.ner_tag, []).append(word.text)
-                    for key, value in line_section_mapping.items():
-                        resume_section_mapping[self.info_to_score[key]].append(" ".join(value))
-            resumes_sections_list.append(ScoreFactor(**resume_section_mapping))
+        for sections, lines in [*map(self.extract_sections, resumes_list), *(profiles or [])]:
+            all_lines.extend(lines)
+            resumes_sections_list.append(sections)
         all_lines.extend(
             text for section in job_description.dict().values() if isinstance(section, list) for text in section
         )
@@ -97,42 +191,231 @@ class ResumeScorer:
         resumes_list: list[ScoreFactor],
         job_description: ScoreFactor,
         threshold: float,
+        top_k: int | None = None,
     ) -> tuple[list[Score], list[ScoreFactor]]:
-        fields = job_description.__fields__.keys()
+        """Score each resume field by field and return them ranked, best first.
+
+        A resume sentence scores its best cosine against the JD sentences of the
+        field; pairs below `threshold` are pruned from the sparse product.
+        Field scores go into a (resumes x fields) matrix and `Score` objects are
+        only built for the returned rows.
+        With `top_k`, resumes are visited in decreasing order of their upper
+        bound (one weighted point per scorable sentence, negative weights
+        counting as zero) and a min-heap keeps the best k. A resume is
+        abandoned as soon as its partial total plus the bound of its remaining
+        fields cannot beat the k-th best.
+        """
+        fields = list(self.info_to_score.values())
+        weights = self.weights(fields)
         jd_dict = job_description.dict()
-        score_list: list[Score] = []
-        for resume_idx, resume in enumerate(resumes_list):
-            resume_score = Score(
-                id=resume.id,
-                save_path=resume.save_path,
-                email=resume.email,
-                phone=resume.phone,
-                location=resume.location,
-                name=resume.name,
-                job_title=resume.job_title,
-            )
-            resume_dict = resume.dict()
-            for field in fields:
-                if field in {"id", "save_path", "email", "phone", "location", "name", "job_title"}:
-                    continue
+        counts = np.array(
+            [[len(getattr(resume, field)) for field in fields] for resume in resumes_list]
+        ).reshape(len(resumes_list), len(fields))
+        jd_fields = np.array([bool(jd_dict[field]) for field in fields])
+        # a negative weight can only lower a total, so it adds nothing to the bound
+        bounds = (np.minimum(counts, 1) if self.normalize else counts) * jd_fields * np.maximum(weights, 0)
+        field_scores = np.zeros(counts.shape)
+        order = np.argsort(-bounds.sum(axis=1), kind="stable") if top_k else range(len(resumes_list))
+        heap: list[tuple[float, int]] = []
+        for resume_idx in order:
+            resume = resumes_list[resume_idx]
+            remaining = bounds[resume_idx].sum()
+            if top_k and len(heap) == top_k and remaining <= heap[0][0]:
+                break
+            total = 0.0
+            for j, field in enumerate(fields):
                 jd_sentences = jd_dict[field]
-                resume_sentences = resume_dict[field]
+                resume_sentences = getattr(resume, field)
                 if not resume_sentences or not jd_sentences:
                     continue
                 all_sentences = resume_sentences + jd_sentences
                 tfidf_matrix = self.vectorizer.transform(all_sentences)
                 resume_tfidf = tfidf_matrix[: len(resume_sentences)]
                 jd_tfidf = tfidf_matrix[len(resume_sentences):]
-                similarity_matrix = cosine_similarity(resume_tfidf, jd_tfidf)
-                sentence_scores = np.max(similarity_matrix, axis=1) if similarity_matrix.size else np.array([0])
-                score = np.sum(sentence_scores) if sentence_scores.size else 0
-                setattr(resume_score, field, score)
-                resume_dict[field] = [
-                    f"{sent}###{sentence_scores[idx]:.4f}" for idx, sent in enumerate(resume_sentences)
-                ]
-            resumes_list[resume_idx] = ScoreFactor(**resume_dict)
+                sentence_scores, _ = max_similarity(resume_tfidf, jd_tfidf, threshold)
+                field_scores[resume_idx, j] = np.sum(sentence_scores) if sentence_scores.size else 0
+                counts[resume_idx, j] = np.count_nonzero(np.diff(resume_tfidf.indptr))
+                if top_k:
+                    score = field_scores[resume_idx, j]
+                    total += weights[j] * (score / max(counts[resume_idx, j], 1) if self.normalize else score)
+                    remaining -= bounds[resume_idx, j]
+                    if len(heap) == top_k and total + remaining <= heap[0][0]:
+                        break
+            else:
+                if not top_k:
+                    continue
+                if len(heap) < top_k:
+                    heapq.heappush(heap, (total, -resume_idx))
+                elif total > heap[0][0]:
+                    heapq.heapreplace(heap, (total, -resume_idx))
+        rows = sorted(-resume_idx for _, resume_idx in heap) if top_k else np.arange(len(resumes_list))
+        sections = [resumes_list[resume_idx] for resume_idx in rows]
+        return self.rank(sections, field_scores[rows], counts[rows], fields, top_k)
+
+    def weights(self, fields: list[str]) -> np.ndarray:
+        return np.array([self.field_weights.get(field, 1.0) for field in fields])
+
+    def aggregate(
+        self, field_scores: np.ndarray, counts: np.ndarray | None, fields: list[str]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Apply normalization and field weights to a (resumes x fields) matrix; returns (field_scores, totals)."""
+        if self.normalize:
+            field_scores = field_scores / np.maximum(counts, 1)
+        return field_scores, field_scores @ self.weights(fields)
+
+    def rank(
+        self,
+        sections: list[ScoreFactor],
+        field_scores: np.ndarray,
+        counts: np.ndarray | None,
+        fields: list[str],
+        top_k: int | None = None,
+    ) -> tuple[list[Score], list[ScoreFactor]]:
+        """Order rows by weighted total and build `Score` objects for the best `top_k` only."""
+        field_scores, totals = self.aggregate(field_scores, counts, fields)
+        order = top_order(totals, top_k)
+        score_list = []
+        for resume_idx in order:
+            resume_score = Score(**sections[resume_idx].dict(include=SCORE_METADATA), total=totals[resume_idx])
+            for j, field in enumerate(fields):
+                setattr(resume_score, field, field_scores[resume_idx, j])
             score_list.append(resume_score)
-        return score_list, resumes_list
+        return score_list, [sections[resume_idx] for resume_idx in order]
+
+    def explain(
+        self, resumes_list: list[ScoreFactor], job_description: ScoreFactor, threshold: float = 0.4
+    ) -> list[Explanation]:
+        """Per-sentence scores and best JD sentence for `resumes_list`, using the vectorizer from `fit`."""
+        jd_dict = job_description.dict()
+        explanations = []
+        for resume in resumes_list:
+            explanation = Explanation(id=resume.id)
+            for field in self.info_to_score.values():
+                jd_sentences = jd_dict[field]
+                resume_sentences = getattr(resume, field)
+                if not resume_sentences or not jd_sentences:
+                    continue
+                tfidf_matrix = self.vectorizer.transform(resume_sentences + jd_sentences)
+                scores, jd_indices = max_similarity(
+                    tfidf_matrix[: len(resume_sentences)], tfidf_matrix[len(resume_sentences):], threshold
+                )
+                explanation.fields[field] = sentence_matches(resume_sentences, scores, jd_indices)
+            explanations.append(explanation)
+        return explanations
+
+    def iter_resumes(
+        self,
+        resume_paths: Iterable[str],
+        save_to_s3: bool = False,
+        s3_client=None,
+        s3_bucket: str = None,
+        s3_prefix: str = "CVs/",
+        dedup: Deduplicator | None = None,
+        deadline: float | None = None,
+    ) -> Iterator[PdfMetadata]:
+        """Parse `resume_paths` one by one; with `dedup`, duplicates are skipped before tokenization and NER.
+
+        With `deadline` (a `time.monotonic()` value), no new file is started once it has passed.
+        """
+        for resume_path in resume_paths:
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+            if dedup is None:
+                data = self.pdf_parser.parse(resume_path, max_length=self.max_length)
+            else:
+                doc = self.extract_unique(resume_path, dedup)
+                if doc is None:
+                    continue
+                encodings, masks, doc = self.pdf_parser.tokenize(doc, self.max_length)
+                data = self.pdf_parser.label(doc, self.pdf_parser.inference_model(encodings), masks)
+            yield PdfMetadata(id=resume_path, data=data)
+            if save_to_s3:
+                self.upload_highlight(PdfMetadata(id=resume_path, data=data), s3_client, s3_bucket, s3_prefix)
+
+    def extract_unique(self, resume_path: str, dedup: Deduplicator):
+        """Extract the text layer of `resume_path`, or return None when `dedup` flags it as a duplicate.
+
+        The content hash is checked first, so exact copies are not even extracted.
+        """
+        doc = None
+        canonical = dedup.match_hash(resume_path, file_hash(resume_path), os.path.getmtime(resume_path))
+        if canonical is None:
+            doc = self.pdf_parser.extract(resume_path)
+            canonical = dedup.match_text(resume_path, document_text(doc))
+        if canonical is not None:
+            logging.info(f"Skipping {resume_path}: duplicate of {canonical}")
+            return None
+        return doc
+
+    def upload_highlight(self, resume_doc: PdfMetadata, s3_client, s3_bucket: str, s3_prefix: str = "CVs/") -> None:
+        data, resume_path = resume_doc.data, resume_doc.id
+        ext_file = os.path.splitext(data.pdf_path)[1].lower()
+        if ext_file == ".pdf":
+            pdf_content = self.pdf_parser.visualize_on_pdf(data, resume_path)
+        elif ext_file in {".png", ".jpg", ".jpeg"}:
+            pdf_content = self.pdf_parser.visualize_on_image(data, resume_path)
+        else:
+            logging.warning(f"Unsupported file format: {data.pdf_path}")
+            return
+        upload_pdf_binary(
+            s3_client=s3_client,
+            s3_bucket_name=s3_bucket,
+            pdf_content=pdf_content,
+            object_name=os.path.basename(resume_path).replace(ext_file, "") + "_hightlight" + ext_file,
+            prefix=s3_prefix,
+        )
+
+    def build_pipeline(
+        self,
+        stage_workers: dict[str, int] | None = None,
+        save_to_s3: bool = False,
+        s3_client=None,
+        s3_bucket: str = None,
+        s3_prefix: str = "CVs/",
+        maxsize: int = 8,
+        dedup: Deduplicator | None = None,
+    ) -> Pipeline:
+        """Staged parse -> reduce pipeline yielding `(resume_id, sections, lines)` per file.
+
+        Extraction, tokenization, ONNX inference, optional highlight upload and
+        section reduction each get their own workers (see `PIPELINE_WORKERS`).
+        With `dedup`, the extract stage drops duplicates before they reach NER.
+        """
+        workers = {**PIPELINE_WORKERS, **(stage_workers or {})}
+        parser = self.pdf_parser
+
+        def extract(resume_path: str) -> tuple | None:
+            if dedup is not None:
+                doc = self.extract_unique(resume_path, dedup)
+                return None if doc is None else (resume_path, doc)
+            return resume_path, parser.extract(resume_path)
+
+        def tokenize(item: tuple) -> tuple:
+            resume_path, doc = item
+            return resume_path, *parser.tokenize(doc, self.max_length)
+
+        def infer(item: tuple) -> PdfMetadata:
+            resume_path, encodings, masks, doc = item
+            return PdfMetadata(id=resume_path, data=parser.label(doc, parser.inference_model(encodings), masks))
+
+        def upload(resume_doc: PdfMetadata) -> PdfMetadata:
+            self.upload_highlight(resume_doc, s3_client, s3_bucket, s3_prefix)
+            return resume_doc
+
+        def reduce(resume_doc: PdfMetadata) -> tuple:
+            return resume_doc.id, *self.extract_sections(resume_doc)
+
+        steps = [("extract", extract), ("tokenize", tokenize), ("infer", infer)]
+        if save_to_s3:
+            steps.append(("upload", upload))
+        steps.append(("reduce", reduce))
+        return Pipeline([Stage(name, func, workers[name], maxsize) for name, func in steps], maxsize=maxsize)
+
+    def iter_sections(self, resumes: Iterable[PdfMetadata]) -> Iterator[tuple[str, ScoreFactor, list[str]]]:
+        """Reduce each parsed resume to its sections so the tagged `Document` can be dropped."""
+        for resume_doc in resumes:
+            sections, lines = self.extract_sections(resume_doc)
+            yield resume_doc.id, sections, lines
 
     def score_from_dir(
         self,
@@ -143,49 +426,407 @@ class ResumeScorer:
         s3_client=None,
         s3_bucket: str = None,
         s3_prefix: str = "CVs/",
+        top_k: int | None = None,
+        stream: bool = False,
+        pipelined: bool = False,
+        stage_workers: dict[str, int] | None = None,
+        explain: bool = False,
+        dedup: bool = True,
+        deadline_ms: int | None = None,
     ) -> tuple:
-        resume_paths = [
-            os.path.join(resume_dir, file_name) for file_name in os.listdir(resume_dir)
-        ]
-        resume_list: list[PdfMetadata] = []
-        for resume_path in resume_paths:
-            data = self.pdf_parser.parse(resume_path, max_length=self.max_length)
-            resume_list.append(PdfMetadata(id=resume_path, data=data))
-            if save_to_s3:
-                ext_file = os.path.splitext(data.pdf_path)[1].lower()
-                if ext_file == ".pdf":
-                    pdf_content = self.pdf_parser.visualize_on_pdf(data, resume_path)
-                elif ext_file in {".png", ".jpg", ".jpeg"}:
-                    pdf_content = self.pdf_parser.visualize_on_image(data, resume_path)
-                else:
-                    logging.warning(f"Unsupported file format: {data.pdf_path}")
-                    continue
-                upload_pdf_binary(
-                    s3_client=s3_client,
-                    s3_bucket_name=s3_bucket,
-                    pdf_content=pdf_content,
-                    object_name=os.path.basename(resume_path).replace(ext_file, "") + "_hightlight" + ext_file,
-                    prefix=s3_prefix,
+        """Parse and score every file in `resume_dir`.
+
+        With `stream`, each file flows through parse -> sections -> term counts
+        and its `Document` is released right away, so memory grows with the
+        sparse section counts rather than the tagged documents. `pipelined`
+        streams the same way through the staged pipeline of `build_pipeline`.
+        With `dedup`, exact and near-duplicate files are collapsed onto the
+        first copy seen before NER and logged. This one-off scan uses its own
+        `Deduplicator`; `self.dedup` stays the warm index's state for `sync_dir`.
+
+        With `deadline_ms`, the directory is brought into the warm index with
+        `sync_dir` until the budget runs out, and the resumes of `resume_dir`
+        indexed by then (earlier syncs first, then whatever finished) are
+        ranked. `coverage(resume_dir)` tells how much is still pending; calling
+        again continues from there. The sync always streams and deduplicates
+        (against `self.dedup`); files parsed by it are uploaded with
+        `save_to_s3`. Asking for `pipelined` or `dedup=False` as well raises
+        ValueError.
+        """
+        if deadline_ms is not None:
+            if pipelined or not dedup:
+                raise ValueError("deadline_ms cannot be combined with pipelined or dedup=False")
+            self.sync_dir(
+                resume_dir, time.monotonic() + deadline_ms / 1000, save_to_s3, s3_client, s3_bucket, s3_prefix
+            )
+            prefix = os.path.join(resume_dir, "")
+            candidates = [resume_id for resume_id in self.index.ids if resume_id.startswith(prefix)]
+            return self.score_index(job_description, threshold, top_k=top_k, explain=explain, candidates=candidates)
+        resume_paths = list(list_resumes(resume_dir))
+        # Structured profiles need neither extraction nor NER
+        profile_paths = [resume_path for resume_path in resume_paths if is_profile(resume_path)]
+        resume_paths = [resume_path for resume_path in resume_paths if not is_profile(resume_path)]
+        deduplicator = None
+        if dedup:
+            deduplicator = Deduplicator()
+        if pipelined:
+            self.pipeline = self.build_pipeline(
+                stage_workers, save_to_s3, s3_client, s3_bucket, s3_prefix, dedup=deduplicator
+            )
+            sections_iter = self.pipeline.run(resume_paths)
+        else:
+            resumes = self.iter_resumes(resume_paths, save_to_s3, s3_client, s3_bucket, s3_prefix, deduplicator)
+            if not stream:
+                profiles = [load_profile(profile_path) for profile_path in profile_paths]
+                resume_list = list(resumes)
+                log_duplicates(deduplicator)
+                return self.score(
+                    resume_list, job_description, threshold, top_k=top_k, explain=explain, profiles=profiles
                 )
-        return self.score(resume_list, job_description, threshold)
+            sections_iter = self.iter_sections(resumes)
+        streamer = ResumeScorer(
+            self.pdf_parser, max_length=self.max_length, field_weights=self.field_weights, normalize=self.normalize
+        )
+        for profile_path in profile_paths:
+            streamer.index.add(profile_path, *load_profile(profile_path))
+        for resume_id, sections, lines in sections_iter:
+            streamer.index.add(resume_id, sections, lines)
+        log_duplicates(deduplicator)
+        result = streamer.score_index(job_description, threshold, top_k=top_k, explain=explain)
+        logging.info(
+            f"Streamed {len(streamer.index)} resumes from {resume_dir}, peak RSS {format_mb(peak_rss_mb())}"
+        )
+        if pipelined:
+            for stats in self.pipeline.stats():
+                logging.info(f"Pipeline stage: {stats}")
+        return result
 
     def score(
         self,
         resume_list: list[PdfMetadata],
         job_description: ScoreFactor,
         threshold: float = 0.4,
-    ) -> tuple[list[Score], list[ScoreFactor], list[ScoreFactor]]:
-        resume_section_list = self.fit(resume_list, job_description)
-        score_list, resume_section_list_add_score = self.compare(
-            resume_section_list, job_description, threshold
+        top_k: int | None = None,
+        explain: bool = False,
+        profiles: list[tuple[ScoreFactor, list[str]]] | None = None,
+    ) -> tuple[list[Score], list[ScoreFactor], list[Explanation]]:
+        """Fit and compare, best first; explanations are only built with `explain`, for the returned resumes.
+
+        `profiles` are (sections, lines) of resumes that skipped parsing, ranked alongside `resume_list`.
+        """
+        resume_section_list = self.fit(resume_list, job_description, profiles)
+        score_list, resume_section_list = self.compare(
+            resume_section_list, job_description, threshold, top_k=top_k
         )
-        for score in score_list:
-            score.total = (
-                score.hardskill
-                + score.softskill
-                + score.education
-                + score.experience
-                + score.project
-                + score.language
-            )
-        return score_list, resume_section_list, resume_section_list_add_score
\ No newline at end of file
+        explanations = self.explain(resume_section_list, job_description, threshold) if explain else []
+        return score_list, resume_section_list, explanations
+
+    def sync_dir(
+        self,
+        resume_dir: str,
+        deadline: float | None = None,
+        save_to_s3: bool = False,
+        s3_client=None,
+        s3_bucket: str = None,
+        s3_prefix: str = "CVs/",
+    ) -> list[str]:
+        """Bring the index in line with `resume_dir`, parsing only new or modified files.
+
+        Files not started before `deadline` (a `time.monotonic()` value) stay
+        pending for the next sync. Structured profiles are indexed first, as
+        they cost no parsing. With `save_to_s3`, the files parsed are uploaded
+        as in `iter_resumes`. Returns the files processed.
+        """
+        resume_paths = list_resumes(resume_dir)
+        prefix = os.path.join(resume_dir, "")
+        for resume_id in self.index.ids:
+            if resume_id.startswith(prefix) and resume_id not in resume_paths:
+                self.index.remove(resume_id)
+        for resume_id in list(self.dedup.stamps):
+            if resume_id.startswith(prefix) and self.dedup.stamps.get(resume_id, -1) != resume_paths.get(resume_id):
+                self.dedup.forget(resume_id)
+        changed = [
+            resume_path
+            for resume_path, stamp in resume_paths.items()
+            if (resume_path in self.index and self.index.stamps[resume_path] != stamp)
+            or (resume_path not in self.index and resume_path not in self.dedup.duplicates)
+        ]
+        for resume_path in changed:
+            if is_profile(resume_path) and (deadline is None or time.monotonic() < deadline):
+                self.index.add(resume_path, *load_profile(resume_path), stamp=resume_paths[resume_path])
+        changed_pdfs = [resume_path for resume_path in changed if not is_profile(resume_path)]
+        resumes = self.iter_resumes(
+            changed_pdfs, save_to_s3, s3_client, s3_bucket, s3_prefix, dedup=self.dedup, deadline=deadline
+        )
+        for resume_id, sections, lines in self.iter_sections(resumes):
+            self.index.add(resume_id, sections, lines, stamp=resume_paths[resume_id])
+        for resume_path in changed:
+            if resume_path in self.dedup.duplicates and resume_path in self.index:
+                self.index.remove(resume_path)
+        changed = [
+            resume_path
+            for resume_path in changed
+            if resume_path in self.index and self.index.stamps[resume_path] == resume_paths[resume_path]
+            or self.dedup.stamps.get(resume_path) == resume_paths[resume_path]
+        ]
+        if changed:
+            logging.info(f"Indexed {len(changed)} resumes from {resume_dir}, peak RSS {format_mb(peak_rss_mb())}")
+        return changed
+
+    def coverage(self, resume_dir: str) -> dict[str, int | bool]:
+        """How much of `resume_dir` the index is in sync with: indexed, duplicate and pending files."""
+        resume_paths = list_resumes(resume_dir)
+        indexed = sum(
+            1 for resume_path, stamp in resume_paths.items()
+            if resume_path in self.index and self.index.stamps[resume_path] == stamp
+        )
+        duplicates = sum(
+            1 for resume_path, stamp in resume_paths.items()
+            if resume_path in self.dedup.duplicates and self.dedup.stamps.get(resume_path) == stamp
+        )
+        pending = len(resume_paths) - indexed - duplicates
+        return {
+            "files": len(resume_paths),
+            "indexed": indexed,
+            "duplicates": duplicates,
+            "pending": pending,
+            "complete": pending == 0,
+        }
+
+    def load_index(self, path: str) -> None:
+        if os.path.exists(os.path.join(path, CorpusIndex.META_FILE)):
+            self.index = CorpusIndex.load(path)
+            self.retriever = CandidateRetriever(self.index)
+            self.field_cache.clear()
+        if os.path.exists(os.path.join(path, Deduplicator.STATE_FILE)):
+            self.dedup = Deduplicator.load(path)
+
+    def save_index(self, path: str) -> None:
+        self.index.save(path)
+        self.dedup.save(path)
+
+    def sync_dense(self, path: str, n_components: int = 128, n_lists: int = 0, refit: bool = False) -> DenseIndex:
+        """Load the LSA index at `path` and bring it in line with the corpus index.
+
+        Resumes changed since are projected with the existing components; the
+        SVD is only refitted with `refit`, or while nothing could be fitted yet.
+        """
+        if self.dense is None and os.path.exists(os.path.join(path, DenseIndex.META_FILE)):
+            self.dense = DenseIndex(path)
+        stale = self.dense is not None and self.dense.index_version != self.index.version
+        if self.dense is None or refit or (stale and not self.dense.fitted):
+            self.dense = DenseIndex.build(self.index, path, n_components=n_components, n_lists=n_lists)
+        elif stale:
+            self.dense = self.dense.update(self.index)
+        return self.dense
+
+    def score_dense(
+        self,
+        job_description: ScoreFactor,
+        threshold: float = 0.4,
+        nprobe: int | None = None,
+        top_k: int | None = None,
+    ) -> tuple[list[Score], list[ScoreFactor], list[Explanation]]:
+        """Score indexed resumes with the LSA engine; `sync_dense` must have been called."""
+        ids, field_scores = self.dense.score(self.index, job_description, threshold=threshold, nprobe=nprobe)
+        return *self._index_results(ids, field_scores, top_k), []
+
+    def score_index(
+        self,
+        job_description: ScoreFactor,
+        threshold: float = 0.4,
+        shortlist: int | None = None,
+        top_k: int | None = None,
+        chunk_size: int = 256,
+        explain: bool = False,
+        candidates: list[str] | None = None,
+    ) -> tuple[list[Score], list[ScoreFactor], list[Explanation]]:
+        """Score indexed resumes against `job_description` without refitting.
+
+        Each field is one sparse product between the stacked sentences of the
+        resumes and the JD sentences; per-sentence maxima are summed per resume.
+        With `shortlist`, only the best BM25 candidates are scored exactly;
+        `candidates` restricts scoring to ids chosen elsewhere (e.g. `keyword_rank`),
+        intersected with the shortlist when both are given.
+        With `top_k`, resumes are scored in chunks of decreasing upper bound and
+        scoring stops once no remaining resume can enter the top k.
+        Explanations are only built with `explain`, for the returned resumes.
+        """
+        ids = self.retriever.shortlist(job_description, shortlist) if shortlist else self.index.ids
+        if candidates is not None:
+            # with both, score the BM25 shortlist restricted to the candidates
+            allowed = set(candidates)
+            ids = [resume_id for resume_id in ids if resume_id in allowed]
+        idf, jd_matrices = self.index.vectorize_query(job_description)
+        if not top_k:
+            field_scores = self._score_ids(ids, idf, jd_matrices, threshold, subset=bool(shortlist) or candidates is not None)
+            if explain:
+                # put the rows in ranked order so explanations line up with the returned scores
+                counts = self.index.sentence_counts(ids) if self.normalize else None
+                order = top_order(self.aggregate(field_scores, counts, self.index.fields)[1])
+                ids, field_scores = [ids[i] for i in order], field_scores[order]
+        else:
+            ids, field_scores = self._top_k_ids(ids, idf, jd_matrices, threshold, top_k, chunk_size)
+        explanations = self.explain_index(ids, idf, jd_matrices, threshold) if explain else []
+        return *self._index_results(ids, field_scores, top_k), explanations
+
+    def _top_k_ids(
+        self, ids: list[str], idf: np.ndarray, jd_matrices: dict, threshold: float, top_k: int, chunk_size: int
+    ) -> tuple[list[str], np.ndarray]:
+        """Heap-select the best `top_k` of `ids`, skipping chunks whose upper bound cannot enter."""
+        fields = self.index.fields
+        jd_fields = np.array([jd_matrices[field].shape[0] > 0 for field in fields])
+        counts = self.index.sentence_counts(ids)
+        weights = np.maximum(self.weights(fields), 0)
+        bounds = (np.minimum(counts, 1) if self.normalize else counts) @ (jd_fields * weights)
+        order = np.argsort(-bounds, kind="stable")
+        heap: list[tuple[float, int]] = []
+        for start in range(0, len(order), chunk_size):
+            chunk = order[start: start + chunk_size]
+            if len(heap) == top_k and bounds[chunk[0]] <= heap[0][0]:
+                break
+            field_scores = self._score_ids([ids[i] for i in chunk], idf, jd_matrices, threshold)
+            _, totals = self.aggregate(field_scores, counts[chunk], fields)
+            for resume_idx, total in zip(chunk, totals):
+                if len(heap) < top_k:
+                    heapq.heappush(heap, (total, -resume_idx))
+                elif total > heap[0][0]:
+                    heapq.heapreplace(heap, (total, -resume_idx))
+        top_ids = [ids[-resume_idx] for _, resume_idx in sorted(heap, reverse=True)]
+        return top_ids, self._score_ids(top_ids, idf, jd_matrices, threshold)
+
+    def rescore(
+        self,
+        job_description: ScoreFactor,
+        threshold: float = 0.4,
+        top_k: int | None = None,
+    ) -> tuple[list[Score], list[ScoreFactor], list[Explanation]]:
+        """Score the whole index, reusing cached per-field results for unchanged JD fields.
+
+        Field results are keyed by the corpus version and the field's JD
+        sentence set, so tweaking one category only recomputes that field and
+        re-sums the totals. To make fields independent of each other, this mode
+        weighs terms with the corpus-only IDF instead of including the JD
+        sentences as documents, so totals differ slightly from `score_index`.
+        """
+        ids = self.index.ids
+        idf = None
+        field_scores = np.zeros((len(ids), len(self.index.fields)))
+        for j, field in enumerate(self.index.fields):
+            sentences = getattr(job_description, field)
+            key = field_key(self.index.version, field, sentences, threshold)
+            scores = self.field_cache.get(key)
+            if scores is None:
+                if idf is None:
+                    idf = self.index.idf()
+                jd_matrix = self.index.transform(list(key[-1]), idf)
+                scores = self._score_field(ids, field, idf, jd_matrix, threshold, subset=False)
+                self.field_cache.put(key, scores)
+            field_scores[:, j] = scores
+        return *self._index_results(ids, field_scores, top_k), []
+
+    def keyword_rank(
+        self,
+        job_description: ScoreFactor,
+        fields: tuple[str, ...] = ("hardskill", "language"),
+        synonyms: dict[str, list[str]] | None = None,
+        top_k: int | None = None,
+        resumes: list[ScoreFactor] | None = None,
+    ) -> list[KeywordScore]:
+        """Rank resumes by exact JD phrase coverage with an Aho–Corasick scan, best first.
+
+        Runs over the indexed sections unless `resumes` is given; cheap enough
+        as a first pass whose ids can be fed to `score_index(candidates=...)`.
+        """
+        matcher = KeywordMatcher(job_description, fields=fields, synonyms=synonyms)
+        resumes = resumes if resumes is not None else list(self.index.sections.values())
+        keyword_scores = [matcher.score(resume) for resume in resumes]
+        keyword_scores.sort(key=lambda keyword_score: keyword_score.total, reverse=True)
+        return keyword_scores[:top_k]
+
+    def score_many(
+        self,
+        job_descriptions: list[ScoreFactor],
+        threshold: float = 0.4,
+        top_k: int | None = None,
+    ) -> list[list[Score]]:
+        """Rank the indexed resumes against several JDs at once, best first per JD.
+
+        The resume sentences are weighed once with the corpus-only IDF (as in
+        `rescore`), and each field is a single sparse product against the
+        stacked sentences of every JD, reduced per JD column block. Since JD
+        sentences do not count as documents here, totals differ slightly from
+        `score_index`.
+        """
+        ids = self.index.ids
+        fields = self.index.fields
+        idf = self.index.idf()
+        field_scores = np.zeros((len(job_descriptions), len(ids), len(fields)))
+        for j, field in enumerate(fields):
+            jd_blocks = [self.index.transform(getattr(jd, field), idf) for jd in job_descriptions]
+            sizes = np.array([block.shape[0] for block in jd_blocks])
+            if not sizes.sum():
+                continue
+            resume_matrix, offsets = self.index.field_matrix(field, idf)
+            if resume_matrix.shape[0] == 0:
+                continue
+            maxima = max_similarity_blocks(resume_matrix, sp.vstack(jd_blocks, format="csr"), sizes, threshold)
+            owners = np.repeat(np.arange(len(ids)), np.diff(offsets))
+            totals = sp.csr_matrix(
+                (np.ones(len(owners)), (owners, np.arange(len(owners)))), shape=(len(ids), len(owners))
+            ) @ maxima
+            field_scores[:, :, j] = totals.T
+        counts = self.index.sentence_counts(ids) if self.normalize else None
+        sections = [self.index.sections[resume_id] for resume_id in ids]
+        return [self.rank(sections, jd_scores, counts, fields, top_k)[0] for jd_scores in field_scores]
+
+    def _score_ids(
+        self, ids: list[str], idf: np.ndarray, jd_matrices: dict, threshold: float = 0.0, subset: bool = True
+    ) -> np.ndarray:
+        """Return the (resumes x fields) score matrix of `ids`.
+
+        `subset=False` means `ids` is the whole index in index order, so the cached stack is used.
+        """
+        field_scores = np.zeros((len(ids), len(self.index.fields)))
+        for j, field in enumerate(self.index.fields):
+            field_scores[:, j] = self._score_field(ids, field, idf, jd_matrices[field], threshold, subset)
+        return field_scores
+
+    def _score_field(
+        self, ids: list[str], field: str, idf: np.ndarray, jd_matrix, threshold: float, subset: bool = True
+    ) -> np.ndarray:
+        if jd_matrix.shape[0] == 0:
+            return np.zeros(len(ids))
+        resume_matrix, offsets = self.index.field_matrix(field, idf, ids if subset else None)
+        if resume_matrix.shape[0] == 0:
+            return np.zeros(len(ids))
+        scores, _ = max_similarity(resume_matrix, jd_matrix, threshold)
+        owners = np.repeat(np.arange(len(ids)), np.diff(offsets))
+        return np.bincount(owners, weights=scores, minlength=len(ids))
+
+    def explain_index(
+        self, ids: list[str], idf: np.ndarray, jd_matrices: dict, threshold: float = 0.0
+    ) -> list[Explanation]:
+        """Per-sentence scores and best JD sentence for the indexed resumes `ids`."""
+        explanations = [Explanation(id=resume_id) for resume_id in ids]
+        for field in self.index.fields:
+            jd_matrix = jd_matrices[field]
+            if jd_matrix.shape[0] == 0:
+                continue
+            resume_matrix, offsets = self.index.field_matrix(field, idf, ids)
+            scores, jd_indices = max_similarity(resume_matrix, jd_matrix, threshold)
+            for resume_idx, explanation in enumerate(explanations):
+                start, end = offsets[resume_idx], offsets[resume_idx + 1]
+                if start == end:
+                    continue
+                explanation.fields[field] = sentence_matches(
+                    getattr(self.index.sections[ids[resume_idx]], field), scores[start:end], jd_indices[start:end]
+                )
+        return explanations
+
+    def _index_results(
+        self, ids: list[str], field_scores: np.ndarray, top_k: int | None = None
+    ) -> tuple[list[Score], list[ScoreFactor]]:
+        counts = self.index.sentence_counts(ids) if self.normalize else None
+        sections = [self.index.sections[resume_id] for resume_id in ids]
+        return self.rank(sections, field_scores, counts, self.index.fields, top_k)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class LRUCache:
+    """Small least-recently-used mapping with a fixed number of entries."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, Any] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        if key not in self._entries:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def field_key(version: int, field: str, sentences: list[str], threshold: float) -> tuple:
+    """Cache key of one field's scores: corpus version plus the field's JD sentence set."""
+    return version, field, threshold, tuple(sorted(set(sentences)))
+
+
+class TTLCache(LRUCache):
+    """`LRUCache` whose entries also expire `ttl` seconds after being stored."""
+
+    def __init__(self, max_entries: int = 128, ttl: float = 600.0) -> None:
+        super().__init__(max_entries)
+        self.ttl = ttl
+
+    def get(self, key: Hashable) -> Any:
+        entry = super().get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self.hits -= 1
+            self.misses += 1
+            return None
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        super().put(key, (time.monotonic() + self.ttl, value))
+
+
+def ranking_key(*parts: Any) -> str:
+    """Hash of the ranking request with text parts case- and whitespace-normalized."""
+    normalized = [re.sub(r"\s+", " ", part).strip().lower() if isinstance(part, str) else part for part in parts]
+    return hashlib.sha1(json.dumps(normalized, default=str).encode()).hexdigest()
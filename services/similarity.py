@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import numpy as np
+import scipy.sparse as sp
+
+
+def similarity_matrix(
+    left: sp.csr_matrix,
+    right: sp.csr_matrix,
+    threshold: float = 0.0,
+    chunk_size: int = 4096,
+) -> sp.csr_matrix:
+    """Sparse `left @ right.T` keeping only entries >= `threshold`.
+
+    Rows are L2-normalized TF-IDF vectors, so entries are cosine similarities.
+    The product is computed `chunk_size` left rows at a time and pruned before
+    the next chunk, so memory is bounded by one chunk plus the kept entries.
+    """
+    right_t = right.T.tocsc()
+    blocks = []
+    for start in range(0, left.shape[0], chunk_size):
+        block = (left[start: start + chunk_size] @ right_t).tocsr()
+        if threshold > 0:
+            block.data[block.data < threshold] = 0
+            block.eliminate_zeros()
+        blocks.append(block)
+    if not blocks:
+        return sp.csr_matrix((0, right.shape[0]))
+    return sp.vstack(blocks, format="csr")
+
+
+def best_matches(similarity: sp.csr_matrix) -> tuple[np.ndarray, np.ndarray]:
+    """Row-wise best similarity and the column it came from (0 for rows with no kept entry)."""
+    if similarity.shape[1] == 0:
+        return np.zeros(similarity.shape[0]), np.zeros(similarity.shape[0], dtype=np.int64)
+    scores = similarity.max(axis=1).toarray().ravel()
+    columns = np.asarray(similarity.argmax(axis=1)).ravel()
+    return scores, columns
+
+
+def max_similarity(
+    left: sp.csr_matrix,
+    right: sp.csr_matrix,
+    threshold: float = 0.0,
+    chunk_size: int = 4096,
+) -> tuple[np.ndarray, np.ndarray]:
+    """`best_matches` of the thresholded product without keeping more than one chunk of it."""
+    scores = np.zeros(left.shape[0])
+    columns = np.zeros(left.shape[0], dtype=np.int64)
+    for start in range(0, left.shape[0], chunk_size):
+        block = similarity_matrix(left[start: start + chunk_size], right, threshold, chunk_size)
+        scores[start: start + chunk_size], columns[start: start + chunk_size] = best_matches(block)
+    return scores, columns
+
+
+def block_maxima(similarity: sp.csr_matrix, sizes: np.ndarray) -> np.ndarray:
+    """Row-wise best similarity within each consecutive column block of `sizes` columns.
+
+    Returns a (rows x blocks) array; rows with no kept entry in a block get 0.
+    """
+    maxima = np.zeros((similarity.shape[0], len(sizes)))
+    if similarity.nnz == 0:
+        return maxima
+    blocks = np.repeat(np.arange(len(sizes)), sizes)[similarity.indices]
+    rows = np.repeat(np.arange(similarity.shape[0]), np.diff(similarity.indptr))
+    keys = rows * len(sizes) + blocks
+    order = np.argsort(keys, kind="stable")
+    keys, data = keys[order], similarity.data[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    maxima.flat[keys[starts]] = np.maximum.reduceat(data, starts)
+    return maxima
+
+
+def max_similarity_blocks(
+    left: sp.csr_matrix,
+    right: sp.csr_matrix,
+    sizes: np.ndarray,
+    threshold: float = 0.0,
+    chunk_size: int = 4096,
+) -> np.ndarray:
+    """`block_maxima` of the thresholded product, `right` being several queries stacked row-wise.
+
+    One product serves every query; only one chunk of it is held at a time.
+    """
+    maxima = np.zeros((left.shape[0], len(sizes)))
+    for start in range(0, left.shape[0], chunk_size):
+        block = similarity_matrix(left[start: start + chunk_size], right, threshold, chunk_size)
+        maxima[start: start + chunk_size] = block_maxima(block, sizes)
+    return maxima
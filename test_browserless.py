@@ -0,0 +1,88 @@
+import asyncio
+import os
+import tempfile
+
+import httpx
+
+from src.services.browserless import BrowserlessRenderer
+
+output_folder = tempfile.mkdtemp()
+PDF_CHUNK = b"%PDF" + b"0" * 1020
+
+
+async def check_concurrency_cap():
+    """Ten renders through a renderer allowing two at a time never overlap more than two."""
+    active = 0
+    peak = 0
+
+    async def handler(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        return httpx.Response(200, content=PDF_CHUNK)
+
+    async with BrowserlessRenderer("http://browserless", max_renders=2, transport=httpx.MockTransport(handler)) as renderer:
+        pdfs = await asyncio.gather(*(renderer.render_to_bytes(f"https://www.cake.me/me/{i}") for i in range(10)))
+        stats = renderer.stats()
+    assert all(pdf == PDF_CHUNK for pdf in pdfs)
+    assert peak == 2, peak
+    assert stats["rendered"] == 10 and stats["in_flight"] == 0, stats
+    print(f"Concurrency: peak {peak} renders in flight, {stats}")
+
+
+async def check_streaming_to_part_file():
+    """The PDF is written to a .part file while streaming and only renamed once complete."""
+    pdf_path = os.path.join(output_folder, "streamed.pdf")
+    seen_while_streaming = []
+
+    async def body():
+        for _ in range(3):
+            seen_while_streaming.append((os.path.exists(pdf_path + ".part"), os.path.exists(pdf_path)))
+            yield PDF_CHUNK
+
+    async def handler(request):
+        return httpx.Response(200, content=body())
+
+    async with BrowserlessRenderer("http://browserless", transport=httpx.MockTransport(handler)) as renderer:
+        path = await renderer.render_to_file("https://www.cake.me/me/streamed", output_folder, "streamed.pdf")
+    assert path == pdf_path
+    assert all(part and not final for part, final in seen_while_streaming), seen_while_streaming
+    assert not os.path.exists(pdf_path + ".part")
+    with open(pdf_path, "rb") as f:
+        assert f.read() == PDF_CHUNK * 3
+    print(f"Streaming: {os.path.getsize(pdf_path)} bytes renamed from .part to {pdf_path}")
+
+
+async def check_cleanup_on_failure():
+    """A failed render leaves neither a .part file nor a PDF behind."""
+    async def broken_body():
+        yield PDF_CHUNK
+        raise httpx.ReadError("connection reset")
+
+    async def handler(request):
+        if request.url.path == "/pdf" and b"error" in request.content:
+            return httpx.Response(500, text="Chrome crashed")
+        return httpx.Response(200, content=broken_body())
+
+    async with BrowserlessRenderer("http://browserless", retries=0, transport=httpx.MockTransport(handler)) as renderer:
+        for url, file_name in [("https://www.cake.me/me/error", "error.pdf"), ("https://www.cake.me/me/reset", "reset.pdf")]:
+            pdf_path = os.path.join(output_folder, file_name)
+            try:
+                await renderer.render_to_file(url, output_folder, file_name)
+            except httpx.HTTPError as e:
+                print(f"Failure: {file_name} raised {type(e).__name__}")
+            else:
+                raise AssertionError(f"{file_name} should have failed")
+            assert not os.path.exists(pdf_path + ".part") and not os.path.exists(pdf_path)
+        assert renderer.stats()["failed"] == 2
+
+
+async def main():
+    await check_concurrency_cap()
+    await check_streaming_to_part_file()
+    await check_cleanup_on_failure()
+
+
+asyncio.run(main())
@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+
+tmp_dir = tempfile.mkdtemp()
+
+# Serve every search from a fixed result list instead of the Custom Search API
+profiles = [f"https://www.cake.me/me/person-{i}" for i in range(25)]
+stub_results = {
+    "python": profiles,
+    # tracking parameters and repeats must not produce duplicate links
+    '"python"': [link + "?utm_source=google" for link in profiles[:5]] + profiles,
+}
+stub_file = os.path.join(tmp_dir, "stub_results.json")
+with open(stub_file, "w", encoding="utf-8") as f:
+    json.dump(stub_results, f)
+os.environ["GOOGLE_SEARCH_STUB_FILE"] = stub_file
+
+from src.services.cake_service import crawl_links_person_cake_google
+from src.services.google_search import GoogleSearchClient, SearchCache, StubSearchBackend
+from src.services.link_store import get_link_store
+
+cache_file = os.path.join(tmp_dir, "google_search_cache.json")
+
+# Paging: 25 links take three pages of 10, requested together
+backend = StubSearchBackend(stub_results)
+client = GoogleSearchClient(backend, SearchCache(cache_file))
+links = client.search("python", 25)
+assert links == profiles, links
+assert sorted(start for _, start in backend.calls) == [0, 10, 20], backend.calls
+assert client.search("python", 5) == profiles[:5]
+assert len(backend.calls) == 3, "the first page should come from the cache"
+assert client.search("unknown", 10) == []
+print(f"Paging: {len(links)} links, backend calls {backend.calls}")
+
+# Persistent cache: a new client reads the pages saved by the previous one
+backend = StubSearchBackend(stub_results)
+cache = SearchCache(cache_file)
+client = GoogleSearchClient(backend, cache)
+assert client.search("python", 25) == profiles
+assert backend.calls == [], backend.calls
+assert cache.hits == 3, cache.hits
+assert SearchCache(cache_file, ttl=0).get("python", 0) is None, "expired pages must not be served"
+print(f"Cache: {cache.hits} hits, {cache.misses} misses after reload")
+
+# Dedup: repeated searches only return links never seen before
+links_file = os.path.join(tmp_dir, "links_person.csv")
+first = crawl_links_person_cake_google("python", "", max_links_person=10, links_person_file=links_file, file_log_name=None)
+second = crawl_links_person_cake_google("python", "", max_links_person=10, links_person_file=links_file, file_log_name=None)
+assert len(first) == len(set(first)) == 10, first
+assert len(second) == len(set(second)) == 10, second
+assert not set(first) & set(second)
+assert all(link.endswith("?locale=en") for link in first + second)
+assert len(get_link_store(links_file)) == 20
+rest = crawl_links_person_cake_google("python", "", max_links_person=10, links_person_file=links_file, file_log_name=None)
+assert len(rest) == 5, rest
+print(f"Dedup: {len(first)} + {len(second)} + {len(rest)} new links, {len(get_link_store(links_file))} stored")
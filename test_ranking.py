@@ -38,5 +38,5 @@ job_description = ScoreFactor(
     language=["english"]
 )
 
-score = scorer.score_from_dir(resume_folder, job_description, parser)
-print(f"Scores: {score}")
+scores, sections, explanations = scorer.score_from_dir(resume_folder, job_description, threshold=0.4)
+print(f"Scores: {scores}")
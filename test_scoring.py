@@ -0,0 +1,184 @@
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from src.models.pdf2tags_entity import Document, Line, Page, Word
+from src.models.resume_entity import PdfMetadata, ScoreFactor
+from src.services.dedup import Deduplicator
+from src.services.keyword_matcher import KeywordMatcher
+from src.services.resume_scoring import ResumeScorer
+
+# Synthetic "PDFs": one resume line per text line, each word written as word/TAG
+WORDS = (
+    "python java sql docker kubernetes communication teamwork leadership bachelor university master years "
+    "experience english chinese vietnamese project analysis uml modeling requirement gathering machine learning "
+    "data science cloud aws react"
+).split()
+TAGS = ["B-Hardskill", "B-Softskill", "B-Education", "B-Experience", "B-Language", "B-Project", "O"]
+
+
+class StubParser:
+    """Stands in for PdfParser: reads the tags from the file instead of running OCR and NER."""
+
+    def extract(self, pdf_path: str) -> Document:
+        lines = []
+        with open(pdf_path, encoding="utf-8") as f:
+            for i, text in enumerate(f.read().splitlines()):
+                words = [
+                    Word(id=f"{i}-{j}", text=token.rsplit("/", 1)[0], bbox=[0, 0, 1, 1], ner_tag=token.rsplit("/", 1)[1])
+                    for j, token in enumerate(text.split())
+                ]
+                lines.append(Line(id=str(i), text=" ".join(word.text for word in words), bbox=[0, 0, 1, 1], words=words))
+        return Document(id=pdf_path, pdf_path=pdf_path, pages=[Page(id="0", lines=lines, line_count=len(lines))])
+
+    def tokenize(self, doc: Document, max_length: int) -> tuple:
+        return [], [], doc
+
+    def inference_model(self, encodings: list) -> list:
+        return []
+
+    def label(self, doc: Document, predictions: list, masks: list) -> Document:
+        return doc
+
+    def parse(self, pdf_path: str, max_length: int = 512) -> Document:
+        return self.extract(pdf_path)
+
+
+def write_resume(path: str, seed: int, n_lines: int = 25):
+    rng = random.Random(seed)
+    lines = [f"Candidate{seed}/B-Name"]
+    for _ in range(n_lines):
+        lines.append(" ".join(f"{rng.choice(WORDS)}/{rng.choice(TAGS)}" for _ in range(rng.randint(2, 7))))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+
+def baseline(resume_dir: str, job_description: ScoreFactor, threshold: float, **options):
+    """The reference ranking: ResumeScorer.score over every file of the folder."""
+    scorer = ResumeScorer(parser, **options)
+    resumes = [
+        PdfMetadata(id=entry.path, data=parser.parse(entry.path)) for entry in sorted(os.scandir(resume_dir), key=lambda e: e.name)
+    ]
+    return scorer.score(resumes, job_description, threshold)
+
+
+def assert_same(result, expected, label: str, top_k: int = None):
+    scores, expected_scores = result[0], expected[0][:top_k]
+    assert [s.id for s in scores] == [s.id for s in expected_scores], f"{label}: different ranking"
+    assert np.allclose([s.total for s in scores], [s.total for s in expected_scores]), f"{label}: different totals"
+    print(f"{label}: {len(scores)} resumes, identical ranking")
+
+
+parser = StubParser()
+work_dir = tempfile.mkdtemp()
+resume_dir = os.path.join(work_dir, "cvs")
+os.makedirs(resume_dir)
+for i in range(40):
+    write_resume(os.path.join(resume_dir, f"cv{i:02d}.pdf"), i)
+
+job_description = ScoreFactor(
+    hardskill=["python sql", "machine learning", "uml modeling"],
+    softskill=["communication", "teamwork"],
+    education=["bachelor university"],
+    experience=["3 years experience"],
+    project=["data science project"],
+    language=["english"],
+)
+
+# Every engine and mode ranks exactly like the baseline
+for options in [{}, {"normalize": True}, {"field_weights": {"hardskill": 2.0, "softskill": -0.5}}]:
+    for threshold in (0.0, 0.4):
+        expected = baseline(resume_dir, job_description, threshold, **options)
+        label = f"{options or 'default'} threshold={threshold}"
+        for mode in [{}, {"stream": True}, {"pipelined": True}, {"dedup": False}, {"deadline_ms": 60000}]:
+            scorer = ResumeScorer(parser, **options)
+            assert_same(scorer.score_from_dir(resume_dir, job_description, threshold, **mode), expected, f"{label} {mode}")
+            top = ResumeScorer(parser, **options).score_from_dir(resume_dir, job_description, threshold, top_k=5, **mode)
+            assert_same(top, expected, f"{label} {mode} top_k=5", top_k=5)
+        scorer = ResumeScorer(parser, **options)
+        scorer.sync_dir(resume_dir)
+        assert_same(scorer.score_index(job_description, threshold), expected, f"{label} score_index")
+        assert_same(scorer.score_index(job_description, threshold, top_k=5), expected, f"{label} score_index top_k=5", top_k=5)
+        assert_same(
+            scorer.score_index(job_description, threshold, shortlist=len(scorer.index)), expected, f"{label} full shortlist"
+        )
+        scores, _, explanations = scorer.score_index(job_description, threshold, explain=True)
+        assert [s.id for s in scores] == [e.id for e in explanations], "explanations out of order"
+
+# Warm index: persistence and incremental sync match a cold baseline
+index_dir = os.path.join(work_dir, "index")
+scorer = ResumeScorer(parser)
+scorer.sync_dir(resume_dir)
+scorer.save_index(index_dir)
+warm = ResumeScorer(parser)
+warm.load_index(index_dir)
+assert warm.sync_dir(resume_dir) == [], "a reloaded index should be up to date"
+assert_same(warm.score_index(job_description), baseline(resume_dir, job_description, 0.4), "reloaded index")
+changed_path = os.path.join(resume_dir, "cv07.pdf")
+write_resume(changed_path, 1000)
+os.utime(changed_path, (time.time() + 10, time.time() + 10))
+os.remove(os.path.join(resume_dir, "cv08.pdf"))
+write_resume(os.path.join(resume_dir, "cv99.pdf"), 99)
+processed = warm.sync_dir(resume_dir)
+assert sorted(processed) == sorted([changed_path, os.path.join(resume_dir, "cv99.pdf")]), processed
+assert_same(warm.score_index(job_description), baseline(resume_dir, job_description, 0.4), "incremental sync")
+
+# Field cache: a repeated JD is served from cache, and changing one field recomputes only that field
+first = warm.rescore(job_description)
+misses = warm.field_cache.misses
+assert_same(warm.rescore(job_description), first, "rescore from cache")
+assert warm.field_cache.misses == misses
+warm.rescore(job_description.model_copy(update={"softskill": ["leadership"]}))
+assert warm.field_cache.misses == misses + 1, "only the edited field should be recomputed"
+# score_many uses the same corpus-only IDF as rescore
+many = warm.score_many([job_description, job_description.model_copy(update={"hardskill": ["java docker"]})])
+assert_same((many[0],), first, "score_many")
+dense = warm.sync_dense(os.path.join(work_dir, "lsa"), n_components=8)
+assert len(warm.score_dense(job_description)[0]) == len(warm.index)
+print(f"LSA: {len(dense.ids)} resumes projected on {dense.components.shape[0]} components")
+
+# Keyword matching: word-bounded, per sentence, synonyms
+matcher = KeywordMatcher(
+    ScoreFactor(hardskill=["machine learning", "java", "uml"], language=["english"]),
+    synonyms={"uml": ["unified modeling language"]},
+)
+keyword_score = matcher.score(ScoreFactor(
+    id="handcrafted",
+    hardskill=["php machine", "learning management systems", "javascript", "Unified Modeling  Language"],
+    language=["English"],
+    project=["machine learning java"],
+))
+assert keyword_score.matches == {"hardskill": {"uml": 1}, "language": {"english": 1}}, keyword_score.matches
+assert np.isclose(keyword_score.total, 1 / 3 + 1)
+print(f"Keywords: {keyword_score.matches}")
+
+# Deduplication: exact copies by hash, near copies by MinHash/LSH
+dedup = Deduplicator()
+text = " ".join(random.Random(1).choice(WORDS) + str(i) for i in range(300))
+assert dedup.match_hash("a.pdf", "hash-a") is None and dedup.match_text("a.pdf", text) is None
+assert dedup.match_hash("copy.pdf", "hash-a") == "a.pdf"
+assert dedup.match_hash("b.pdf", "hash-b") is None
+assert dedup.match_text("b.pdf", text.replace("python", "cobol", 1)) == "a.pdf"
+assert dedup.match_hash("c.pdf", "hash-c") is None
+assert dedup.match_text("c.pdf", " ".join(random.Random(2).choice(WORDS) + str(i) for i in range(300))) is None
+print(f"Dedup: {dedup.duplicates}")
+
+# Coverage: a deadline leaves files pending, duplicates are counted, a later sync completes
+dup_dir = os.path.join(work_dir, "dups")
+os.makedirs(dup_dir)
+for i in range(3):
+    write_resume(os.path.join(dup_dir, f"cv{i}.pdf"), i)
+shutil.copy(os.path.join(dup_dir, "cv0.pdf"), os.path.join(dup_dir, "cv0_copy.pdf"))
+scorer = ResumeScorer(parser)
+scorer.sync_dir(dup_dir, deadline=time.monotonic())
+coverage = scorer.coverage(dup_dir)
+assert coverage["pending"] == 4 and not coverage["complete"], coverage
+scores = scorer.score_from_dir(dup_dir, job_description, deadline_ms=60000)[0]
+coverage = scorer.coverage(dup_dir)
+assert coverage == {"files": 4, "indexed": 3, "duplicates": 1, "pending": 0, "complete": True}, coverage
+assert len(scores) == 3
+print(f"Coverage: {coverage}")
@@ -4,12 +4,12 @@ from dotenv import load_dotenv
 import csv
 import sys
 import re
+import hashlib
 
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 load_dotenv("/.env")
 
 ERROR_LOG_FOLDER = os.getenv("ERROR_LOG_FOLDER", "logs/")
-LINKS_PERSON_FILE = os.getenv("LINKS_PERSON_FILE", "data/links_person.csv")
 
 
 def log_error(message: str, file_name: str):
@@ -41,39 +41,6 @@ def save_dict_data_to_txt(data, file_path):
     with open(file_path, 'a', encoding='utf-8') as file:
         file.write(json.dumps(data, ensure_ascii=False) + "\n")
 
-def save_link_to_csv(link, keyword=None, location=None, level=None, filename=LINKS_PERSON_FILE):
-    """
-    Save a link and related metadata to a CSV file.
-
-    Args:
-        link (str): The link to save.
-        keyword (str, optional): The associated keyword. Defaults to None.
-        location (str, optional): The associated location. Defaults to None.
-        level (str, optional): The associated level. Defaults to None.
-        filename (str): The name of the CSV file. Defaults to LINKS_PERSON_FILE.
-    """
-    print("Saving link to CSV file...", filename)
-
-    # Create the file with headers if it doesn't exist
-    if not os.path.exists(filename):
-        print("Creating new CSV file...")
-        with open(filename, mode="w", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
-            writer.writerow(["Keyword", "Location", "Level", "Link"])
-    else:
-        print("CSV file already exists...")
-
-    # Append data to the CSV file
-    with open(filename, mode="a", newline="", encoding="utf-8") as file:
-        writer = csv.writer(file)
-        # Add a row with the data
-        writer.writerow([
-            keyword if keyword else "",
-            location if location else "",
-            level if level else "",
-            link if link else "",
-        ])
-
 def get_data_from_col_from_csv(file_path: str, col: str = 'Link') -> list:
     """
     Extract data from a specific column in a CSV file.
@@ -106,4 +73,23 @@ def sanitize_filename(url: str) -> str:
     # Replace invalid characters for filenames with underscores
     sanitized_url = re.sub(r'[<>:"/\\|?*.-]', '_', url)
     # Append the .pdf extension
-    return sanitized_url + ".pdf"
\ No newline at end of file
+    return sanitized_url + ".pdf"
+
+def dir_version(dir_path: str) -> str:
+    """
+    Fingerprint a directory from the name, size and mtime of its files.
+
+    Adding, removing or rewriting a file changes the fingerprint without
+    reading any file content.
+
+    Args:
+        dir_path (str): The directory to fingerprint.
+
+    Returns:
+        str: A hex digest identifying the current directory contents.
+    """
+    digest = hashlib.sha1()
+    for entry in sorted(os.scandir(dir_path), key=lambda e: e.name):
+        stat = entry.stat()
+        digest.update(f"{entry.name}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()